@@ -10,11 +10,14 @@ sys.stdout.reconfigure(encoding='utf-8')
 # Ajouter le dossier src au chemin
 sys.path.append(str(Path(__file__).parent / "src"))
 
+# Analyses de l'export (colonnes à lire pour l'export sans menu)
+EXPORT_ANALYSES = [('compare_groups', 'Departement'), 'get_student_ranking', ('calculate_success_rate', 'Filière')]
+
 def format_number(value, decimals=2):
     """Formate un nombre avec les décimales appropriées"""
     if isinstance(value, (int, np.integer)):
         return f"{value:,}"
-    elif isinstance(value, float):
+    elif isinstance(value, (float, np.floating)):
         return f"{value:.{decimals}f}"
     return str(value)
 
@@ -290,6 +293,54 @@ def display_department_statistics(dept_stats):
         print(f"   • Écart moyen: {ranking_df['Moyenne'].std():.2f} points")
         print(f"   • Différence 1er/dernier: {ranking_df['Moyenne'].max() - ranking_df['Moyenne'].min():.2f} points")
 
+def export_results(analyzer, output_dir='outputs/statistiques'):
+    """Exporte les statistiques par département, le classement et les taux de réussite en CSV"""
+    print("\n💾 Export des résultats...")
+    import os
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Statistiques par département
+    dept_stats = analyzer.compare_groups('Departement')
+    dept_stats.to_csv(f'{output_dir}/statistiques_departements.csv')
+    display_comparison_table("📊 STATISTIQUES PAR DÉPARTEMENT (Export)", dept_stats)
+    
+    # Classement des étudiants
+    ranking = analyzer.get_student_ranking(100)
+    ranking.to_csv(f'{output_dir}/classement_etudiants.csv')
+    display_student_ranking(ranking.head(20), "🏆 TOP 20 ÉTUDIANTS")
+    
+    # Taux de réussite
+    success_rates = analyzer.calculate_success_rate('Filière')
+    success_rates.to_csv(f'{output_dir}/taux_reussite_filieres.csv')
+    display_table("📈 TAUX DE RÉUSSITE PAR FILIÈRE", success_rates)
+    
+    print(f"✅ Résultats exportés dans {output_dir}/")
+
+def export_batch(file_path="data/raw/notes_epl.csv", n_workers=None):
+    """Export sans menu (python run.py --export) : seules les colonnes des analyses exportées sont lues
+    
+    Avec n_workers (--workers N), les agrégats sont calculés par ParallelAnalyzer
+    sur N processus, à partir des colonnes de ses agrégats partiels.
+    """
+    from src.data_loader import DataLoader
+    from src.data_analyzer import DataAnalyzer
+    from src.parallel import PARALLEL_COLUMNS, ParallelAnalyzer
+    
+    print("\n📂 Chargement des colonnes utiles à l'export...")
+    loader = DataLoader(file_path)
+    if n_workers:
+        df = loader.load_columns(columns=PARALLEL_COLUMNS)
+    else:
+        df = loader.load_columns(analyses=EXPORT_ANALYSES)
+    if df is None:
+        print("❌ Impossible de charger les données. Arrêt.")
+        return
+    if n_workers:
+        print(f"⚡ Calcul réparti sur {n_workers} processus")
+        export_results(ParallelAnalyzer(df, n_workers=n_workers))
+    else:
+        export_results(DataAnalyzer(df))
+
 def main():
     print("=" * 60)
     print("SYSTÈME D'ANALYSE DES NOTES - ÉCOLE POLYTECHNIQUE DE LILLE")
@@ -299,18 +350,16 @@ def main():
     from src.data_analyzer import DataAnalyzer
     from src.data_visualizer import DataVisualizer
     
-    # 1. Charger les données
+    # 1. Charger les données nettoyées (depuis le cache si la source n'a pas changé)
     print("\n📂 Chargement des données...")
     loader = DataLoader("data/raw/notes_epl.csv")
-    df = loader.load_data()
+    df = loader.load_clean_data()
     
     if df is None:
         print("❌ Impossible de charger les données. Arrêt.")
         return
     
-    # 2. Nettoyer les données
-    print("🧹 Nettoyage des données...")
-    df = loader.clean_data()
+    # 2. Résumé des données
     summary = loader.get_summary()
     
     if summary:
@@ -318,7 +367,7 @@ def main():
     
     # 3. Analyser les données
     print("\n📈 Analyse des données...")
-    analyzer = DataAnalyzer(df)
+    analyzer = DataAnalyzer(df, schema=loader.to_star_schema())
     
     # Menu principal
     while True:
@@ -376,27 +425,7 @@ def main():
         
         elif choix == "3":
             # Export des résultats
-            print("\n💾 Export des résultats...")
-            import os
-            output_dir = 'outputs/statistiques'
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Statistiques par département
-            dept_stats = analyzer.compare_groups('Departement')
-            dept_stats.to_csv(f'{output_dir}/statistiques_departements.csv')
-            display_comparison_table("📊 STATISTIQUES PAR DÉPARTEMENT (Export)", dept_stats)
-            
-            # Classement des étudiants
-            ranking = analyzer.get_student_ranking(100)
-            ranking.to_csv(f'{output_dir}/classement_etudiants.csv')
-            display_student_ranking(ranking.head(20), "🏆 TOP 20 ÉTUDIANTS")
-            
-            # Taux de réussite
-            success_rates = analyzer.calculate_success_rate('Filière')
-            success_rates.to_csv(f'{output_dir}/taux_reussite_filieres.csv')
-            display_table("📈 TAUX DE RÉUSSITE PAR FILIÈRE", success_rates)
-            
-            print("✅ Résultats exportés dans outputs/statistiques/")
+            export_results(analyzer)
         
         elif choix == "4":
             # Lancer Streamlit
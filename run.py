@@ -15,5 +15,19 @@ if sys.platform == "win32":
 
 # Lancer le script principal
 if __name__ == "__main__":
-    from main import main
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Analyse des notes EPL")
+    parser.add_argument("--export", action="store_true",
+                        help="exporte les résultats sans menu (seules les colonnes nécessaires sont lues)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus pour l'export (ParallelAnalyzer)")
+    args = parser.parse_args()
+    if args.workers is not None and (not args.export or args.workers < 1):
+        parser.error("--workers s'utilise avec --export et un nombre de processus >= 1")
+    
+    if args.export:
+        from main import export_batch
+        export_batch(n_workers=args.workers)
+    else:
+        from main import main
+        main()
\ No newline at end of file
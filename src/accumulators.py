@@ -0,0 +1,313 @@
+import numpy as np
+import pandas as pd
+
+from src.group_statistics import STAT_NAMES, group_codes, moment_statistics, segment_moments
+from src.quantiles import GRID_BINS, TDigest, grid_bins, histogram_median, histogram_quantile
+
+
+def _merge_moments(n_a, mean_a, m2_a, m3_a, m4_a, n_b, mean_b, m2_b, m3_b, m4_b):
+    """Combine les moments centrés de deux ensembles disjoints (formules de Pébay)"""
+    n = n_a + n_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = mean_b - mean_a
+        ratio_b = np.where(n > 0, n_b / n, 0.0)
+        mean = np.where(n_a == 0, mean_b, np.where(n_b == 0, mean_a, mean_a + delta * ratio_b))
+        delta = np.where((n_a == 0) | (n_b == 0), 0.0, delta)
+        n_safe = np.where(n > 0, n, 1)
+        m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / n_safe
+        m3 = (m3_a + m3_b + delta ** 3 * n_a * n_b * (n_a - n_b) / n_safe ** 2
+              + 3 * delta * (n_a * m2_b - n_b * m2_a) / n_safe)
+        m4 = (m4_a + m4_b + delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n_safe ** 3
+              + 6 * delta ** 2 * (n_a ** 2 * m2_b + n_b ** 2 * m2_a) / n_safe ** 2
+              + 4 * delta * (n_a * m3_b - n_b * m3_a) / n_safe)
+    return n, mean, m2, m3, m4
+
+
+def _histogram_digests(histograms, bin_values):
+    """Un t-digest par ligne d'histogrammes (passage au mode approché)"""
+    return [TDigest().update_weighted(bin_values, row) for row in histograms]
+
+
+class GroupedStatsAccumulator:
+    """Statistiques de Note_Finale par groupe, mises à jour bloc par bloc et fusionnables
+
+    Chaque groupe conserve son effectif, sa moyenne, les sommes des écarts centrés
+    (M2, M3, M4), le minimum, le maximum et l'histogramme des notes au pas de 0.1.
+    Les blocs peuvent arriver dans n'importe quel ordre (lecture par blocs, parties
+    traitées en parallèle, ajouts successifs) : le résultat ne dépend que des lignes vues.
+    Les quantiles sont exacts tant que chaque case ne reçoit qu'une seule valeur (`exact`),
+    ce qui est le cas des notes arrondies au dixième. Sinon, chaque groupe passe à un
+    t-digest (`digests`) initialisé depuis son histogramme : quantiles approchés, mémoire bornée.
+    """
+
+    def __init__(self):
+        self.labels = pd.Index([])
+        self.rows = np.zeros(0, dtype=np.int64)        # lignes vues, NaN compris (clé 'count')
+        self.count = np.zeros(0, dtype=np.int64)       # valeurs non manquantes
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.m3 = np.zeros(0)
+        self.m4 = np.zeros(0)
+        self.minimum = np.zeros(0)
+        self.maximum = np.zeros(0)
+        self.histograms = np.zeros((0, GRID_BINS), dtype=np.int64)
+        self.bin_values = np.arange(GRID_BINS, dtype='float64') / 10
+        self.bin_seen = np.zeros(GRID_BINS, dtype=bool)
+        self.exact = True
+        self.digests = None                             # t-digests par groupe une fois `exact` perdu
+
+    def _align(self, labels):
+        """Positions des libellés dans l'accumulateur, en ajoutant les nouveaux groupes"""
+        new_labels = pd.Index(labels).difference(self.labels, sort=False)
+        if len(new_labels) > 0:
+            added = len(new_labels)
+            self.labels = self.labels.append(new_labels)
+            self.rows = np.concatenate([self.rows, np.zeros(added, dtype=np.int64)])
+            self.count = np.concatenate([self.count, np.zeros(added, dtype=np.int64)])
+            for name in ('mean', 'm2', 'm3', 'm4'):
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(added)]))
+            self.minimum = np.concatenate([self.minimum, np.full(added, np.inf)])
+            self.maximum = np.concatenate([self.maximum, np.full(added, -np.inf)])
+            self.histograms = np.vstack([self.histograms, np.zeros((added, GRID_BINS), dtype=np.int64)])
+            if self.digests is not None:
+                self.digests.extend(TDigest() for _ in range(added))
+        return self.labels.get_indexer(labels)
+
+    def _merge_bins(self, bin_values, bin_seen, exact):
+        """Vérifie qu'une case désigne toujours la même valeur, sinon les quantiles deviennent approchés"""
+        shared = self.bin_seen & bin_seen
+        if not exact or not np.array_equal(self.bin_values[shared], bin_values[shared]):
+            if self.digests is None:
+                # Histogrammes encore exacts : ils initialisent les t-digests
+                self.digests = _histogram_digests(self.histograms, self.bin_values)
+            self.exact = False
+        self.bin_values = np.where(self.bin_seen, self.bin_values, bin_values)
+        self.bin_seen |= bin_seen
+
+    def update(self, values, groups=None):
+        """Intègre un bloc de notes ; groups donne le groupe de chaque note (None : groupe unique)"""
+        values = np.asarray(values, dtype='float64')
+        if groups is None:
+            codes = np.zeros(len(values), dtype=np.int64)
+            labels = pd.Index([None])
+        else:
+            codes, labels = group_codes(pd.Series(groups))
+            codes = np.asarray(codes, dtype=np.int64)
+        n_groups = len(labels)
+
+        grouped = codes >= 0
+        rows = np.bincount(codes[grouped], minlength=n_groups)
+        keep = grouped & ~np.isnan(values)
+        values, codes = values[keep], codes[keep]
+
+        count = np.bincount(codes, minlength=n_groups)
+        mean, m2, m3, m4 = segment_moments(values, codes, count)
+        minimum = np.full(n_groups, np.inf)
+        np.minimum.at(minimum, codes, values)
+        maximum = np.full(n_groups, -np.inf)
+        np.maximum.at(maximum, codes, values)
+
+        # Cases de la grille 0.1 (l'ordre des notes est conservé) ; si une case reçoit deux
+        # valeurs différentes, les notes ne sont plus sur la grille et les quantiles deviennent approchés
+        bins, bin_values, bin_seen, exact = grid_bins(values)
+        histograms = np.bincount(codes * GRID_BINS + bins,
+                                 minlength=n_groups * GRID_BINS).reshape(n_groups, GRID_BINS)
+
+        self._merge_bins(bin_values, bin_seen, exact)
+        present = rows > 0
+        positions = self._combine(labels[present], rows[present], count[present], mean[present],
+                                  m2[present], m3[present], m4[present], minimum[present],
+                                  maximum[present], histograms[present])
+        if self.digests is not None:
+            # Valeurs de chaque groupe rendues contiguës par un tri stable des codes
+            order = np.argsort(codes, kind='stable')
+            segments = np.split(values[order], np.cumsum(count[present])[:-1])
+            for position, group_values in zip(positions, segments):
+                self.digests[position].update(group_values)
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre accumulateur (autre partie, autre processus) dans celui-ci"""
+        self._merge_bins(other.bin_values, other.bin_seen, other.exact)
+        positions = self._combine(other.labels, other.rows, other.count, other.mean, other.m2,
+                                  other.m3, other.m4, other.minimum, other.maximum, other.histograms)
+        if self.digests is not None:
+            digests = other.digests
+            if digests is None:
+                digests = _histogram_digests(other.histograms, other.bin_values)
+            for position, digest in zip(positions, digests):
+                self.digests[position].merge(digest)
+        return self
+
+    def _combine(self, labels, rows, count, mean, m2, m3, m4, minimum, maximum, histograms):
+        """Ajoute des agrégats par groupe ; retourne la position de chaque libellé"""
+        positions = self._align(labels)
+        (self.count[positions], self.mean[positions], self.m2[positions],
+         self.m3[positions], self.m4[positions]) = _merge_moments(
+            self.count[positions], self.mean[positions], self.m2[positions],
+            self.m3[positions], self.m4[positions], count, mean, m2, m3, m4)
+        self.rows[positions] += rows
+        self.minimum[positions] = np.minimum(self.minimum[positions], minimum)
+        self.maximum[positions] = np.maximum(self.maximum[positions], maximum)
+        self.histograms[positions] += histograms
+        return positions
+
+    def _quantile(self, q):
+        """Quantile de chaque groupe : exact sur l'histogramme, sinon approché par son t-digest"""
+        if self.exact:
+            return histogram_quantile(self.histograms, self.bin_values, q)
+        return np.array([digest.quantile(q) for digest in self.digests], dtype='float64')
+
+    def to_frame(self):
+        """Statistiques par groupe (index = libellés triés, colonnes = STAT_NAMES)"""
+        variance, skewness, kurtosis = moment_statistics(self.count, self.m2, self.m3, self.m4)
+        empty = self.count == 0
+        if self.exact:
+            median = histogram_median(self.histograms, self.bin_values)
+        else:
+            median = self._quantile(0.5)
+        q1, q3 = self._quantile(0.25), self._quantile(0.75)
+        frame = pd.DataFrame({
+            'moyenne': np.where(empty, np.nan, self.mean),
+            'mediane': median,
+            'ecart_type': np.sqrt(variance),
+            'variance': variance,
+            'minimum': np.where(empty, np.nan, self.minimum),
+            'maximum': np.where(empty, np.nan, self.maximum),
+            'q1': q1,
+            'q3': q3,
+            'iqr': q3 - q1,
+            'count': self.rows.astype('float64'),
+            'skewness': skewness,
+            'kurtosis': kurtosis
+        }, index=self.labels)
+        return frame.sort_index()
+
+    def statistics(self):
+        """Dictionnaire {(groupe, statistique): valeur}, comme DataAnalyzer._calculate_group_stats"""
+        return self.to_frame().stack(future_stack=True).to_dict()
+
+
+class StatsAccumulator(GroupedStatsAccumulator):
+    """Accumulateur d'une seule série (mêmes clés que DataAnalyzer._calculate_stats)"""
+
+    def update(self, values, groups=None):
+        return super().update(values)
+
+    def statistics(self):
+        row = self.to_frame().iloc[0] if len(self.labels) else pd.Series(np.nan, index=STAT_NAMES)
+        stats = {name: np.float64(row[name]) for name in STAT_NAMES}
+        stats['count'] = int(self.rows.sum())
+        return stats
+
+
+# Regroupements de DataAnalyzer.calculate_basic_statistics : clé du résultat -> colonne
+BASIC_STATISTICS_GROUPS = {
+    'par_departement': 'Departement',
+    'par_filiere': 'Filière',
+    'par_ue': 'Nom_UE',
+    'par_matiere': 'Matiere',
+    'par_enseignant': 'Enseignant',
+}
+
+# Champs sauvegardés de chaque accumulateur
+STATE_FIELDS = ['labels', 'rows', 'count', 'mean', 'm2', 'm3', 'm4', 'minimum', 'maximum',
+                'histograms', 'bin_values', 'bin_seen', 'exact', 'digests']
+
+
+class BasicStatisticsAccumulator:
+    """Accumulateurs de calculate_basic_statistics : global + un par regroupement"""
+
+    def __init__(self):
+        self.accumulators = {'global': StatsAccumulator()}
+        for key in BASIC_STATISTICS_GROUPS:
+            self.accumulators[key] = GroupedStatsAccumulator()
+
+    def update(self, df):
+        """Intègre un bloc de données nettoyées"""
+        notes = df['Note_Finale']
+        self.accumulators['global'].update(notes)
+        for key, column in BASIC_STATISTICS_GROUPS.items():
+            if column in df.columns:
+                self.accumulators[key].update(notes, df[column])
+        return self
+
+    def merge(self, other):
+        for key, accumulator in self.accumulators.items():
+            accumulator.merge(other.accumulators[key])
+        return self
+
+    def statistics(self):
+        """Même dictionnaire que DataAnalyzer.calculate_basic_statistics"""
+        return {key: accumulator.statistics() for key, accumulator in self.accumulators.items()}
+
+    def save(self, path):
+        """Sauvegarde l'état de tous les accumulateurs (un seul fichier .npz, sans pickle)
+
+        Les libellés sont écrits en chaînes (avec un masque des libellés None, celui du
+        total global) ; les t-digests en tableaux float64 concaténés (centroïdes, poids)
+        avec les positions de début de chaque groupe.
+        """
+        state = {}
+        for key, accumulator in self.accumulators.items():
+            for field in STATE_FIELDS:
+                value = getattr(accumulator, field)
+                if field == 'labels':
+                    missing = np.array([label is None for label in value], dtype=bool)
+                    state[f"{key}.labels_none"] = missing
+                    value = np.array(['' if label is None else str(label) for label in value], dtype=str)
+                elif field == 'digests':
+                    if value is not None:
+                        state.update(self._digest_state(key, value))
+                    continue
+                state[f"{key}.{field}"] = value
+        np.savez(path, **state)
+
+    @staticmethod
+    def _digest_state(key, digests):
+        """Tableaux numériques des t-digests d'un accumulateur (un segment par groupe)"""
+        sizes = [len(digest.means) for digest in digests]
+        return {
+            f"{key}.digest_offsets": np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+            f"{key}.digest_means": np.concatenate([digest.means for digest in digests] + [np.zeros(0)]).astype('float64'),
+            f"{key}.digest_weights": np.concatenate([digest.weights for digest in digests] + [np.zeros(0)]).astype('float64'),
+            f"{key}.digest_bounds": np.array([[digest.minimum, digest.maximum] for digest in digests],
+                                             dtype='float64').reshape(-1, 2),
+            f"{key}.digest_compression": np.array([digest.compression for digest in digests], dtype='float64'),
+        }
+
+    @staticmethod
+    def _digests_from_state(state, key):
+        """Reconstruit les t-digests sauvegardés par _digest_state (None en mode exact)"""
+        if f"{key}.digest_offsets" not in state.files:
+            return None
+        offsets = state[f"{key}.digest_offsets"]
+        means, weights = state[f"{key}.digest_means"], state[f"{key}.digest_weights"]
+        digests = []
+        for i, ((minimum, maximum), compression) in enumerate(zip(state[f"{key}.digest_bounds"],
+                                                                  state[f"{key}.digest_compression"])):
+            digest = TDigest(compression)
+            digest.means = means[offsets[i]:offsets[i + 1]].copy()
+            digest.weights = weights[offsets[i]:offsets[i + 1]].copy()
+            digest.minimum, digest.maximum = float(minimum), float(maximum)
+            digests.append(digest)
+        return digests
+
+    @classmethod
+    def load(cls, path):
+        """Recharge un état sauvegardé avec save()"""
+        state = np.load(path, allow_pickle=False)
+        accumulator = cls()
+        for key, item in accumulator.accumulators.items():
+            for field in STATE_FIELDS:
+                if field == 'digests':
+                    item.digests = cls._digests_from_state(state, key)
+                    continue
+                value = state[f"{key}.{field}"]
+                if field == 'labels':
+                    missing = state[f"{key}.labels_none"]
+                    value = pd.Index([None if none else str(label) for label, none in zip(value, missing)])
+                elif field == 'exact':
+                    value = bool(value)
+                setattr(item, field, value)
+        return accumulator
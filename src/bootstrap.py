@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.group_statistics import group_codes
+from src.quantiles import grid_bins
+
+# Nombre de rééchantillonnages et niveau de confiance par défaut
+DEFAULT_RESAMPLES = 10000
+DEFAULT_CONFIDENCE = 0.95
+
+# Taille maximale (rééchantillonnages x notes) d'une matrice d'indices tirée en une fois
+MAX_BATCH_SIZE = 4_000_000
+
+# Statistiques rééchantillonnées : nom de la colonne du résultat
+BOOTSTRAP_STATISTICS = ['Moyenne', 'Mediane', 'Taux_reussite']
+
+
+def _median_from_counts(counts, values):
+    """Médiane (moyenne des deux valeurs centrales) de chaque ligne d'effectifs par valeur triée"""
+    n = counts.sum(axis=1)
+    cumulative = np.cumsum(counts, axis=1)
+    low = (cumulative <= ((n - 1) // 2)[:, None]).sum(axis=1)
+    high = (cumulative <= (n // 2)[:, None]).sum(axis=1)
+    return (values[low] + values[high]) / 2
+
+
+def _resample_counts(values, counts, n_resamples, rng, threshold):
+    """Tirage multinomial des effectifs de chaque valeur distincte (coût indépendant de l'effectif)"""
+    n = counts.sum()
+    draws = rng.multinomial(n, counts / n, size=n_resamples)
+    return (draws @ values / n,
+            _median_from_counts(draws, values),
+            draws[:, values >= threshold].sum(axis=1) / n * 100)
+
+
+def _resample_indices(values, n_resamples, rng, threshold):
+    """Matrices d'indices tirées par lots (rééchantillonnages x notes), réduites ligne par ligne"""
+    n = len(values)
+    batch = max(1, MAX_BATCH_SIZE // n)
+    means, medians, rates = [], [], []
+    for start in range(0, n_resamples, batch):
+        sample = values[rng.integers(0, n, size=(min(batch, n_resamples - start), n))]
+        means.append(sample.mean(axis=1))
+        medians.append(np.median(sample, axis=1))
+        rates.append((sample >= threshold).mean(axis=1) * 100)
+    return np.concatenate(means), np.concatenate(medians), np.concatenate(rates)
+
+
+def bootstrap_group(values, counts, n_resamples, seed, threshold, confidence):
+    """Bornes (basse, haute) de la moyenne, de la médiane et du taux de réussite d'un groupe
+
+    values : valeurs distinctes triées ; counts : effectif de chaque valeur. Tirer n notes
+    avec remise revient à tirer les effectifs selon une loi multinomiale : ce tirage
+    coûte un binomial par valeur distincte et n'est retenu que s'il y a au moins deux
+    fois plus de notes que de valeurs (notes sur la grille 0.1) ; sinon les notes sont
+    tirées par matrices d'indices.
+    """
+    rng = np.random.default_rng(seed)
+    if 2 * len(values) < counts.sum():
+        replicates = _resample_counts(values, counts, n_resamples, rng, threshold)
+    else:
+        replicates = _resample_indices(np.repeat(values, counts), n_resamples, rng, threshold)
+    alpha = (1 - confidence) / 2
+    return np.array([np.quantile(replicate, [alpha, 1 - alpha]) for replicate in replicates])
+
+
+def _bootstrap_groups(tasks):
+    """Bornes d'une liste de groupes (exécuté dans un processus du pool)"""
+    return [bootstrap_group(*task) for task in tasks]
+
+
+class GroupBootstrap:
+    """Intervalles de confiance bootstrap (percentiles) par groupe pour compare_groups
+
+    Chaque groupe est réduit à ses valeurs distinctes et leurs effectifs. Pour des notes
+    au dixième, un rééchantillonnage est un tirage multinomial sur au plus 201 valeurs :
+    moyenne, médiane et taux de réussite se lisent sur les effectifs tirés, pour tous
+    les rééchantillonnages à la fois, quel que soit le nombre de notes du groupe. Chaque
+    groupe a sa propre graine (SeedSequence.spawn) : les intervalles ne dépendent pas
+    du nombre de processus entre lesquels les groupes sont répartis.
+    """
+
+    def __init__(self, df, group_column='Departement', threshold=10.0):
+        self.group_column = group_column
+        self.threshold = threshold
+        notes = df['Note_Finale'].to_numpy(dtype='float64')
+        codes, self.labels = group_codes(df[group_column])
+        codes = np.asarray(codes, dtype=np.int64)
+        keep = (codes >= 0) & ~np.isnan(notes)
+        codes, notes = codes[keep], notes[keep]
+
+        # Notes de la grille 0.1 : une case par valeur (valeurs exactes de la grille)
+        bins, bin_values, _, exact = grid_bins(notes)
+        if not exact:
+            bin_values, bins = np.unique(notes, return_inverse=True)
+        counts = np.bincount(codes * len(bin_values) + bins,
+                             minlength=len(self.labels) * len(bin_values)).reshape(len(self.labels), -1)
+        self.groups = [(bin_values[row > 0], row[row > 0]) for row in counts]
+
+    def intervals(self, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, seed=0, n_workers=1):
+        """Estimations et bornes de l'intervalle de chaque groupe observé (une ligne par groupe)"""
+        observed = [i for i, (_, counts) in enumerate(self.groups) if counts.sum() > 0]
+        seeds = np.random.SeedSequence(seed).spawn(len(self.groups))
+        tasks = [(*self.groups[i], n_resamples, seeds[i], self.threshold, confidence) for i in observed]
+
+        if n_workers == 1 or len(tasks) < 2:
+            bounds = _bootstrap_groups(tasks)
+        else:
+            # Groupes répartis en lots contigus, un lot par processus
+            batches = [batch.tolist() for batch in np.array_split(np.arange(len(tasks)), n_workers) if len(batch)]
+            with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+                results = pool.map(_bootstrap_groups, [[tasks[i] for i in batch] for batch in batches])
+                bounds = [bound for result in results for bound in result]
+
+        rows = []
+        for i, bound in zip(observed, bounds):
+            values, counts = self.groups[i]
+            n = counts.sum()
+            row = {'Count': n,
+                   'Moyenne': counts @ values / n,
+                   'Mediane': _median_from_counts(counts[None, :], values)[0],
+                   'Taux_reussite': counts[values >= self.threshold].sum() / n * 100}
+            for name, (low, high) in zip(BOOTSTRAP_STATISTICS, bound):
+                row[f"{name}_IC_bas"] = low
+                row[f"{name}_IC_haut"] = high
+            rows.append(row)
+        columns = ['Count'] + [f"{name}{suffix}" for name in BOOTSTRAP_STATISTICS
+                               for suffix in ('', '_IC_bas', '_IC_haut')]
+        return pd.DataFrame(rows, index=pd.Index(self.labels[observed], name=self.group_column), columns=columns)
@@ -19,9 +19,13 @@ IS_CLOUD = 'STREAMLIT_CLOUD' in os.environ or 'STREAMLIT_SHARING' in os.environ
 # Ajouter le chemin du projet
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.data_loader import DataLoader
+from src.data_loader import DataLoader, read_csv_preview, compression_codec
+from src.data_validator import DataValidator, ERREUR
 from src.data_analyzer import DataAnalyzer
 from src.data_visualizer import DataVisualizer
+from src.olap_cube import GradeCube
+from src.filter_index import FilterIndex
+from src.what_if import scenario_grid
 
 # --- FONCTIONS DE CHARGEMENT OPTIMISÉES ---
 @st.cache_data(ttl=3600, show_spinner=False)
@@ -31,18 +35,13 @@ def load_default_data():
         if IS_CLOUD:
             # Sur le cloud, on peut charger depuis une URL GitHub
             data_url = "https://raw.githubusercontent.com/devhyacinthe/eplstats/main/data/raw/notes_epl.csv"
-            df = pd.read_csv(data_url)
-        else:
-            # En local, charger depuis le fichier
-            data_path = Path(__file__).parent.parent / "data" / "raw" / "notes_epl.csv"
-            df = pd.read_csv(data_path)
-        
-        # Nettoyer les données
-        loader = DataLoader(None)
-        loader.df = df
-        df = loader.clean_data()
+            loader = DataLoader(None)
+            loader.data = loader._read_csv(data_url)
+            return loader.clean_data()
         
-        return df
+        # En local, charger depuis le fichier (ou son cache Parquet)
+        data_path = Path(__file__).parent.parent / "data" / "raw" / "notes_epl.csv"
+        return DataLoader(data_path).load_clean_data()
     except Exception as e:
         st.error(f"❌ Erreur de chargement: {str(e)}")
         return None
@@ -69,6 +68,10 @@ class StreamlitDashboard:
             st.session_state.analyzer = None
         if 'visualizer' not in st.session_state:
             st.session_state.visualizer = None
+        if 'rejections' not in st.session_state:
+            st.session_state.rejections = None
+        if 'filter_index' not in st.session_state:
+            st.session_state.filter_index = None
         
         # Initialiser les variables d'instance à partir de session_state
         self.data_loaded = st.session_state.data_loaded
@@ -77,7 +80,7 @@ class StreamlitDashboard:
         self.analyzer = st.session_state.analyzer
         self.visualizer = st.session_state.visualizer
     
-    def load_data_from_file(self, file_path, file_name):
+    def load_data_from_file(self, file_path, file_name, use_cache=True):
         """Charge les données depuis un fichier"""
         try:
             # Afficher un spinner pendant le chargement
@@ -86,11 +89,13 @@ class StreamlitDashboard:
                 if IS_CLOUD:
                     df = load_default_data()
                 else:
-                    df = data_loader.load_data()
+                    df = data_loader.load_clean_data(use_cache=use_cache)
                 
                 if df is not None:
-                    df = data_loader.clean_data()
-                    analyzer = DataAnalyzer(df)
+                    # Cube des agrégats construit une fois : les filtres de la sidebar s'y appliquent ensuite
+                    # Schéma en étoile : les regroupements hors cube se font sur ses clés entières
+                    schema = data_loader.to_star_schema() if data_loader.data is df else None
+                    analyzer = DataAnalyzer(df, cube=GradeCube.from_frame(df), schema=schema)
                     visualizer = DataVisualizer(df)
                     
                     # Mettre à jour les variables de session
@@ -99,6 +104,8 @@ class StreamlitDashboard:
                     st.session_state.df = df
                     st.session_state.analyzer = analyzer
                     st.session_state.visualizer = visualizer
+                    st.session_state.rejections = data_loader.rejections
+                    st.session_state.filter_index = FilterIndex(df)
                     
                     # Mettre à jour les variables d'instance
                     self.data_loaded = True
@@ -129,7 +136,7 @@ class StreamlitDashboard:
             st.subheader("Télécharger votre propre fichier CSV")
             uploaded_file = st.file_uploader(
                 "Choisissez un fichier CSV",
-                type=["csv"],
+                type=["csv", "gz", "zst"],  # CSV brut ou compressé (.csv.gz, .csv.zst)
                 help="Le fichier doit contenir les colonnes: ID_Etudiant, Departement, Note_Finale, etc.",
                 key="file_uploader"
             )
@@ -138,7 +145,8 @@ class StreamlitDashboard:
                 # Afficher un aperçu du fichier
                 try:
                     # Lire les premières lignes pour prévisualisation
-                    preview_df = pd.read_csv(uploaded_file, nrows=5)
+                    preview_df = read_csv_preview(uploaded_file, nrows=5,
+                                                  compression=compression_codec(uploaded_file.name))
                     st.info("Aperçu du fichier (5 premières lignes):")
                     st.dataframe(preview_df)
                     
@@ -164,13 +172,16 @@ class StreamlitDashboard:
                 
                 # Bouton pour charger le fichier
                 if st.button("📂 Charger ce fichier", type="primary", use_container_width=True):
-                    # Sauvegarder le fichier temporairement
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
+                    # Sauvegarder le fichier temporairement, tel quel : un fichier compressé
+                    # garde son extension et sera décompressé en flux à la lecture
+                    suffix = ''.join(Path(uploaded_file.name).suffixes[-2:]) or '.csv'
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
                         tmp_file.write(uploaded_file.getvalue())
                         tmp_path = tmp_file.name
                     
                     # Charger les données
-                    if self.load_data_from_file(tmp_path, uploaded_file.name):
+                    # Fichier temporaire : pas de cache, son nom change à chaque envoi
+                    if self.load_data_from_file(tmp_path, uploaded_file.name, use_cache=False):
                         # Forcer le rerun
                         st.rerun()
                     
@@ -193,7 +204,7 @@ class StreamlitDashboard:
                 
                 # Prévisualiser le fichier
                 try:
-                    preview_df = pd.read_csv(default_file, nrows=5)
+                    preview_df = read_csv_preview(default_file, nrows=5)
                     st.info("Aperçu du fichier par défaut (5 premières lignes):")
                     st.dataframe(preview_df)
                 except:
@@ -298,6 +309,8 @@ class StreamlitDashboard:
                 st.session_state.df = None
                 st.session_state.analyzer = None
                 st.session_state.visualizer = None
+                st.session_state.rejections = None
+                st.session_state.filter_index = None
                 st.rerun()
         
         # S'assurer que les variables d'instance sont à jour
@@ -357,33 +370,45 @@ class StreamlitDashboard:
                 step=0.5
             )
             
-            # Appliquer les filtres
-            filtered_df = self.df.copy()
-            if selected_departements and 'Departement' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Departement'].isin(selected_departements)]
-            if selected_filieres and 'Filière' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Filière'].isin(selected_filieres)]
-            if selected_annees and 'Annee_etude' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Annee_etude'].isin(selected_annees)]
-            
-            # Mettre à jour l'analyseur avec les données filtrées
-            self.analyzer.df = filtered_df
+            # Appliquer les filtres : ET des bitmaps de l'index, sans copie du DataFrame complet
+            filters = {}
+            if selected_departements and 'Departement' in self.df.columns:
+                filters['Departement'] = selected_departements
+            if selected_filieres and 'Filière' in self.df.columns:
+                filters['Filière'] = selected_filieres
+            if selected_annees and 'Annee_etude' in self.df.columns:
+                filters['Annee_etude'] = selected_annees
+            if st.session_state.filter_index is None:
+                st.session_state.filter_index = FilterIndex(self.df)
+            filtered_df = st.session_state.filter_index.view(filters)
+            
+            # Mettre à jour l'analyseur avec les données filtrées (et les filtres, pour le cube)
+            self.analyzer.set_view(filtered_df, filters)
             self.visualizer.df = filtered_df
             
+            # Moyenne lue dans le cube, réussite au seuil choisi lue dans les histogrammes cumulés
+            cube = self.analyzer.cube_for()
+            totals = cube.query(filters).iloc[0] if cube is not None else None
+            histogram = self.analyzer.grade_histogram() if 'Note_Finale' in filtered_df.columns else None
+            
             # Métriques dans la sidebar
             st.markdown("---")
             st.header("📊 Métriques")
             
             col1, col2 = st.columns(2)
             with col1:
-                if 'Note_Finale' in filtered_df.columns:
+                if totals is not None:
+                    st.metric("Moyenne", f"{totals['Moyenne_Finale']:.2f}/20")
+                elif 'Note_Finale' in filtered_df.columns:
                     moyenne = filtered_df['Note_Finale'].mean()
                     st.metric("Moyenne", f"{moyenne:.2f}/20")
                 else:
                     st.metric("Moyenne", "N/A")
             
             with col2:
-                if 'Note_Finale' in filtered_df.columns:
+                if histogram is not None and histogram.exact:
+                    st.metric("Taux réussite", f"{histogram.pass_rate(seuil_reussite):.1f}%")
+                elif 'Note_Finale' in filtered_df.columns:
                     taux_reussite = (filtered_df['Note_Finale'] >= seuil_reussite).mean() * 100
                     st.metric("Taux réussite", f"{taux_reussite:.1f}%")
                 else:
@@ -395,7 +420,8 @@ class StreamlitDashboard:
         
         # Layout principal avec tabs
         tab_names = ["📊 Vue d'ensemble", "📈 Analyses détaillées", "🏆 Classements", 
-                    "🏫 Enseignants", "📋 Données brutes", "🔍 Qualité des données", "💾 Export"]
+                    "🏫 Enseignants", "📋 Données brutes", "🔍 Qualité des données", "🧪 Simulation",
+                    "💾 Export"]
         
         # Vérifier quelles onglets sont disponibles
         available_tabs = []
@@ -420,6 +446,8 @@ class StreamlitDashboard:
                 elif i == 5:
                     self._show_quality_tab()
                 elif i == 6:
+                    self._show_what_if_tab(seuil_reussite)
+                elif i == 7:
                     self._show_export_tab(filtered_df)
     
     # ... (les autres méthodes restent les mêmes: _show_overview_tab, _show_analysis_tab, etc.)
@@ -523,6 +551,26 @@ class StreamlitDashboard:
         fig = px.bar(comparison, x=comparison.index, y='Moyenne_Finale',
                     title=f'Moyennes finales par {analysis_type.lower()}')
         st.plotly_chart(fig, use_container_width=True)
+        
+        # Intervalles de confiance : un groupe de quelques notes n'est pas aussi fiable qu'un département
+        if st.checkbox("Afficher les intervalles de confiance (bootstrap, 95 %)"):
+            intervals = self.analyzer.compare_groups_intervals(selected_column)
+            st.dataframe(intervals.round(2))
+            fig = px.bar(intervals, x=intervals.index, y='Moyenne',
+                         error_y=intervals['Moyenne_IC_haut'] - intervals['Moyenne'],
+                         error_y_minus=intervals['Moyenne'] - intervals['Moyenne_IC_bas'],
+                         title=f'Moyennes et intervalles de confiance par {analysis_type.lower()}')
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Les écarts entre groupes sont-ils significatifs ? (tous les regroupements calculés et mémorisés ensemble)
+        if st.checkbox("Afficher les tests de significativité"):
+            significance = self.analyzer.test_significance()
+            tests = significance['tests']
+            st.dataframe(tests[tests['Regroupement'] == selected_column].drop(columns='Regroupement'))
+            pairs = significance['comparaisons']
+            pairs = pairs[(pairs['Regroupement'] == selected_column) & pairs['Significatif']]
+            st.write(f"{len(pairs)} paire(s) significativement différente(s) (Welch, correction de Holm)")
+            st.dataframe(pairs.drop(columns='Regroupement').sort_values('p_value_Holm'))
     
     def _show_ranking_tab(self, filtered_df):
         """Affiche l'onglet des classements"""
@@ -532,10 +580,8 @@ class StreamlitDashboard:
         
         # Classement des étudiants
         st.subheader(f"Top {top_n} étudiants")
-        # Créer un analyzer temporaire avec les données filtrées
-        from src.data_analyzer import DataAnalyzer
-        temp_analyzer = DataAnalyzer(filtered_df)
-        ranking = temp_analyzer.get_student_ranking(top_n)
+        # L'analyseur porte déjà la vue filtrée (résultat mémorisé par combinaison de filtres)
+        ranking = self.analyzer.get_student_ranking(top_n)
         st.dataframe(ranking)
         
         # Section pour générer le bulletin PDF d'un étudiant
@@ -576,13 +622,72 @@ class StreamlitDashboard:
         # Classement des départements
         st.markdown("---")
         st.subheader("Classement des départements")
-        dept_stats = temp_analyzer.compare_groups('Departement')
+        dept_stats = self.analyzer.compare_groups('Departement')
         dept_stats = dept_stats.sort_values('Moyenne_Finale', ascending=False)
         
         fig = px.bar(dept_stats, x=dept_stats.index, y='Moyenne_Finale',
                     title='Moyenne par département (classement)')
         st.plotly_chart(fig, use_container_width=True)
     
+    def _show_what_if_tab(self, seuil_reussite):
+        """Affiche l'onglet de simulation de jury (coefficients et seuil de réussite)"""
+        st.header("🧪 Simulation de jury")
+        
+        if not {'Note_Devoir', 'Note_Examen', 'ID_Etudiant'} <= set(self.analyzer.df.columns):
+            st.warning("Colonnes 'Note_Devoir', 'Note_Examen' ou 'ID_Etudiant' non trouvées")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            coef_devoir = st.slider("Coefficient du devoir (l'examen complète à 1)", 0.0, 1.0, 0.4, 0.05)
+        with col2:
+            seuil = st.slider("Seuil de réussite simulé", 0.0, 20.0, float(seuil_reussite), 0.5,
+                              key="seuil_simulation")
+        
+        # Scénario choisi + grille de comparaison, évalués en un seul appel vectorisé
+        grid = scenario_grid([0.3, 0.4, 0.5, 0.6], [9.0, 9.5, 10.0, 10.5, 11.0])
+        result = self.analyzer.simulate_scenarios([{'Coefficient_Devoir': coef_devoir, 'Seuil': seuil}] + grid)
+        scenario = result['scenarios'].iloc[0]
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Taux de réussite simulé", f"{scenario['Taux_reussite']:.1f}%",
+                      delta=f"{scenario['Variation_taux']:+.1f} pts")
+        with col2:
+            st.metric("Moyenne simulée", f"{scenario['Moyenne']:.2f}/20")
+        with col3:
+            st.metric("Notes changeant de statut", f"{int(scenario['Changements_statut']):,}")
+        
+        # Taux par groupe : actuel contre simulé
+        if result['groupes']:
+            group_column = st.selectbox("Regroupement", list(result['groupes']), key="groupe_simulation")
+            rates = result['groupes'][group_column][['Actuel', 0]].rename(columns={0: 'Simulé'})
+            fig = px.bar(rates, x=rates.index, y=['Actuel', 'Simulé'], barmode='group',
+                         labels={'value': 'Taux de réussite (%)', 'variable': ''},
+                         title=f"Taux de réussite par {group_column.lower()}")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Étudiants dont le rang change le plus
+        st.subheader("Variations de rang")
+        changes = pd.DataFrame({
+            'Rang_actuel': result['rangs']['Actuel'],
+            'Rang_simule': result['rangs'][0],
+            'Variation': result['variations_rangs'][0]
+        })
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Plus fortes progressions**")
+            st.dataframe(changes.nlargest(10, 'Variation'))
+        with col2:
+            st.write("**Plus fortes baisses**")
+            st.dataframe(changes.nsmallest(10, 'Variation'))
+        
+        # Grille de scénarios
+        st.subheader("Taux de réussite selon les coefficients et le seuil")
+        table = result['scenarios'].iloc[1:].pivot(index='Coefficient_Devoir', columns='Seuil',
+                                                    values='Taux_reussite').round(1)
+        st.dataframe(table)
+    
     def _show_teachers_tab(self, filtered_df):
         """Affiche l'onglet des enseignants"""
         st.header("👨‍🏫 Gestion des enseignants")
@@ -627,7 +732,7 @@ class StreamlitDashboard:
             
             # Statistiques par matière
             st.subheader("📊 Statistiques par matière")
-            subject_stats = teacher_data.groupby(['Code_Matiere', 'Matiere']).agg({
+            subject_stats = teacher_data.groupby(['Code_Matiere', 'Matiere'], observed=True).agg({
                 'Note_Finale': ['count', 'mean', 'std', 'min', 'max'],
                 'Reussite': 'mean'
             }).round(2)
@@ -645,7 +750,7 @@ class StreamlitDashboard:
             st.subheader("👥 Étudiants enseignés")
             
             # Grouper par étudiant pour avoir une vue d'ensemble
-            student_summary = teacher_data.groupby(['ID_Etudiant', 'Nom', 'Prenom']).agg({
+            student_summary = teacher_data.groupby(['ID_Etudiant', 'Nom', 'Prenom'], observed=True).agg({
                 'Note_Finale': ['count', 'mean'],
                 'Reussite': 'mean'
             }).round(2)
@@ -767,28 +872,35 @@ class StreamlitDashboard:
         
         problems = []
         
-        # Vérifier les notes hors limites
-        invalid_notes = self.df[(self.df['Note_Finale'] < 0) | (self.df['Note_Finale'] > 20)]
-        if len(invalid_notes) > 0:
-            problems.append(f"❌ {len(invalid_notes)} notes en dehors de l'intervalle [0, 20]")
+        # Violations relevées par les règles de validation lors du nettoyage
+        rejections = st.session_state.rejections
+        summary = DataValidator.summarize(rejections)
+        for _, row in summary.iterrows():
+            icon = "❌" if row['Gravite'] == ERREUR else "⚠️"
+            action = "lignes écartées" if row['Gravite'] == ERREUR else "lignes signalées"
+            colonne = f" ({row['Colonne']})" if row['Colonne'] else ""
+            problems.append(f"{icon} {row['Regle']}{colonne} : {row['Lignes']} {action}")
         
         # Vérifier les colonnes avec trop de valeurs nulles
         high_null_cols = quality_df[quality_df['% Nulles'] > 50]['Colonne'].tolist()
         if high_null_cols:
             problems.append(f"⚠️ {len(high_null_cols)} colonnes avec plus de 50% de valeurs nulles")
         
-        # Vérifier les incohérences dans les taux de réussite
-        if 'Reussite' in self.df.columns and 'Note_Finale' in self.df.columns:
-            inconsistent = self.df[((self.df['Note_Finale'] >= 10) & (self.df['Reussite'] == False)) |
-                                 ((self.df['Note_Finale'] < 10) & (self.df['Reussite'] == True))]
-            if len(inconsistent) > 0:
-                problems.append(f"❌ {len(inconsistent)} incohérences entre Note_Finale et Reussite")
-        
         if problems:
             for problem in problems:
                 st.warning(problem)
         else:
             st.success("✅ Aucun problème majeur détecté")
+        
+        if rejections is not None and not rejections.empty:
+            with st.expander(f"📋 Rapport des rejets ({len(rejections):,} violations)"):
+                st.dataframe(rejections, use_container_width=True)
+                st.download_button(
+                    label="💾 Télécharger le rapport",
+                    data=rejections.to_csv(index=False).encode('utf-8'),
+                    file_name="rapport_rejets.csv",
+                    mime="text/csv"
+                )
     
     def _show_export_tab(self, filtered_df):
         """Affiche l'onglet d'export"""
@@ -1,33 +1,137 @@
 import numpy as np
+import pandas as pd
+
+from src.accumulators import BASIC_STATISTICS_GROUPS, BasicStatisticsAccumulator
+from src.bootstrap import DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES, GroupBootstrap
+from src.grade_histogram import GradeHistogram
+from src.group_statistics import GroupStatistics, group_codes
+from src.olap_cube import CUBE_DIMENSIONS
+from src.query import Query
+from src.ranking import StudentRanking
+from src.weighted_averages import TranscriptAggregator
+from src.what_if import WhatIfEngine
+from src.result_cache import ResultCache, dataset_fingerprint, filter_signature
+from src.significance import DEFAULT_ALPHA, SignificanceTests
+
+# Agrégats de compare_groups et calculate_success_rate, exécutés par Query (noms des colonnes de GradeCube.query)
+COMPARISON_AGGREGATES = {
+    'Moyenne_Finale': ('Note_Finale', 'mean'),
+    'Mediane': ('Note_Finale', 'median'),
+    'Ecart_type': ('Note_Finale', 'std'),
+    'Count': ('Note_Finale', 'count'),
+    'Min': ('Note_Finale', 'min'),
+    'Max': ('Note_Finale', 'max'),
+    'Variance': ('Note_Finale', 'var'),
+    'Nombre_reussites': ('Reussite_Bool', 'sum'),
+    'Moyenne_Devoir': ('Note_Devoir', 'mean'),
+    'Moyenne_Examen': ('Note_Examen', 'mean')
+}
+SUCCESS_RATE_AGGREGATES = {
+    'Taux_reussite': ('Reussite_Bool', 'pass_rate'),
+    'Nombre_notes': ('Note_Finale', 'count'),
+    'Moyenne_finale': ('Note_Finale', 'mean')
+}
 
 class DataAnalyzer:
-    def __init__(self, dataframe):
+    def __init__(self, dataframe, cube=None, cache=None, schema=None):
+        self.df = dataframe
+        self.cube = cube  # GradeCube construit sur les données complètes (optionnel)
+        self.schema = schema  # StarSchema des données complètes (optionnel) : regroupements sur clés entières
+        self.cache = cache if cache is not None else ResultCache()
+        self.filters = {}
+        self._dataset = dataframe
+        self._fingerprint = None
+        self._view = dataframe
+        self._statistics = None
+        self._ranking = None
+        self._histogram = None
+        self._schema_rows = None
+    
+    def set_view(self, dataframe, filters=None):
+        """Remplace les données analysées par une vue filtrée, décrite par filters {colonne: valeurs}"""
         self.df = dataframe
+        self.filters = {col: list(values) for col, values in (filters or {}).items()}
+        self._view = dataframe
+    
+    def cube_for(self, group_column=None):
+        """Cube utilisable pour ce regroupement (None si la vue ou la colonne ne s'y prêtent pas)"""
+        if self.cube is None or not self.cube.exact or self._view is not self.df:
+            return None  # df remplacé sans set_view : les filtres du cube ne sont plus connus
+        if group_column is not None and group_column not in CUBE_DIMENSIONS:
+            return None
+        if any(col not in CUBE_DIMENSIONS for col in self.filters):
+            return None
+        return self.cube
+    
+    def _rows_in_schema(self):
+        """Positions des lignes de la vue dans la table de faits (None : toutes, False : schéma inutilisable)"""
+        if self.schema is None or len(self.schema.facts) != len(self._dataset):
+            return False
+        if self.df is self._dataset:
+            return None
+        if self._schema_rows is None or self._schema_rows[0] is not self.df:
+            rows = self.schema.facts.index.get_indexer(self.df.index)
+            self._schema_rows = (self.df, False if (rows < 0).any() else rows)
+        return self._schema_rows[1]
+    
+    def _group_codes(self, group_column):
+        """Codes et libellés d'un regroupement, lus sur les clés du schéma en étoile quand il y en a un"""
+        if self.schema is not None and self.schema.dimension_of(group_column) is not None:
+            rows = self._rows_in_schema()
+            if rows is not False:
+                return self.schema.group_codes(group_column, rows)
+        return group_codes(self.df[group_column])
+    
+    def _group_key(self, group_column):
+        """Clé de groupby catégorielle construite à partir des codes entiers du regroupement"""
+        codes, labels = self._group_codes(group_column)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=labels),
+                         index=self.df.index, name=group_column)
+    
+    def fingerprint(self):
+        """Empreinte des données complètes, calculée une seule fois"""
+        if self._fingerprint is None:
+            self._fingerprint = dataset_fingerprint(self._dataset)
+        return self._fingerprint
+    
+    def _cached(self, method, compute, *args):
+        """Résultat mémorisé pour (données, filtres, méthode, arguments)"""
+        if self._view is not self.df:
+            return compute()  # df remplacé sans set_view : la vue n'est pas décrite par les filtres
+        key = (self.fingerprint(), filter_signature(self.filters), method, args)
+        return self.cache.get_or_compute(key, compute)
+    
+    def query(self):
+        """Requête paresseuse sur la vue : where, select, group_by, agg puis collect (voir Query)"""
+        return Query(self)
     
     def calculate_basic_statistics(self):
         """Calcule les statistiques descriptives de base"""
+        return self._cached('calculate_basic_statistics', self._basic_statistics)
+    
+    def _basic_statistics(self):
         stats_dict = {}
         
         # Statistiques globales
-        stats_dict['global'] = self._calculate_stats(self.df['Note_Finale'])
-        
-        # Par département
-        stats_dict['par_departement'] = self._calculate_group_stats('Departement')
-        
-        # Par filière
-        stats_dict['par_filiere'] = self._calculate_group_stats('Filière')
+        stats_dict['global'] = self._statistics_engine().summary()
         
-        # Par UE
-        stats_dict['par_ue'] = self._calculate_group_stats('Nom_UE')
-        
-        # Par matière
-        stats_dict['par_matiere'] = self._calculate_group_stats('Matiere')
-        
-        # Par enseignant
-        stats_dict['par_enseignant'] = self._calculate_group_stats('Enseignant')
+        # Par département, filière, UE, matière et enseignant
+        for key, group_column in BASIC_STATISTICS_GROUPS.items():
+            stats_dict[key] = self._calculate_group_stats(group_column)
         
         return stats_dict
     
+    @staticmethod
+    def basic_statistics_from_chunks(chunks):
+        """calculate_basic_statistics sur des blocs successifs, sans garder les données en mémoire
+        
+        chunks : itérable de DataFrames nettoyés (lecture par blocs, parties d'un DataStore, ...)
+        """
+        accumulator = BasicStatisticsAccumulator()
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator.statistics()
+    
     def _calculate_stats(self, data_series):
         """Calcule les statistiques pour une série de données"""
         return {
@@ -45,28 +149,44 @@ class DataAnalyzer:
             'kurtosis': data_series.kurtosis()
         }
     
+    def _statistics_engine(self):
+        """Moteur de statistiques par groupe, reconstruit seulement si self.df a changé"""
+        if self._statistics is None or self._statistics[0] is not self.df:
+            self._statistics = (self.df, GroupStatistics(self.df['Note_Finale']))
+        return self._statistics[1]
+    
     def _calculate_group_stats(self, group_column):
         """Calcule les statistiques par groupe"""
-        grouped = self.df.groupby(group_column)['Note_Finale'].apply(self._calculate_stats) #on applique la fonction de stats à chaque groupe
-        return grouped.to_dict()
+        grouped = self._statistics_engine().grouped(*self._group_codes(group_column), group_column) #toutes les statistiques de tous les groupes en une passe
+        return grouped.stack(future_stack=True).to_dict()
     
     def calculate_success_rate(self, groupby_column=None):
-        """Calcule le taux de réussite"""
+        """Calcule le taux de réussite (requête Query : cube ou lignes de la vue)"""
+        query = self.query().agg(**SUCCESS_RATE_AGGREGATES)
         if groupby_column:
-            results = self.df.groupby(groupby_column).agg({
-                'Reussite_Bool': ['mean', 'count'],
-                'Note_Finale': 'mean'
-            })
-            results.columns = ['Taux_reussite', 'Nombre_notes', 'Moyenne_finale']
-            results['Taux_reussite'] = results['Taux_reussite'] * 100
-        else:
-            results = {
-                'Taux_reussite': self.df['Reussite_Bool'].mean() * 100,
-                'Nombre_notes': len(self.df),
-                'Moyenne_finale': self.df['Note_Finale'].mean()
-            }
-        
-        return results
+            query = query.group_by(groupby_column)
+        return query.collect()
+    
+    @staticmethod
+    def success_rate_from_cube(results, groupby_column=None):
+        """Résultat de calculate_success_rate à partir de GradeCube.query"""
+        results = results.rename(columns={'Count': 'Nombre_notes', 'Moyenne_Finale': 'Moyenne_finale'})
+        results = results[['Taux_reussite', 'Nombre_notes', 'Moyenne_finale']]
+        if groupby_column:
+            return results
+        totals = results.iloc[0].to_dict()  # ligne convertie en float : l'effectif redevient entier
+        totals['Nombre_notes'] = int(totals['Nombre_notes'])
+        return totals
+    
+    @staticmethod
+    def comparison_from_cube(results):
+        """Résultat de compare_groups à partir de GradeCube.query (ou de Query avec COMPARISON_AGGREGATES)"""
+        comparison = results.assign(Taux_reussite=results['Nombre_reussites'] / results['Count'])
+        comparison = comparison[['Moyenne_Finale', 'Mediane', 'Ecart_type', 'Count',
+                                 'Min', 'Max', 'Variance',
+                                 'Taux_reussite', 'Moyenne_Devoir', 'Moyenne_Examen']].round(2)
+        comparison['Taux_reussite'] = comparison['Taux_reussite'].apply(lambda x: np.ceil(float(x) * 100))
+        return comparison
     
     def calculate_correlation(self):
         """Calcule les corrélations entre les notes"""
@@ -75,24 +195,59 @@ class DataAnalyzer:
     
     def get_student_ranking(self, top_n=50):
         """Classe les étudiants par moyenne générale"""
-        student_avg = self.df.groupby('ID_Etudiant').agg({
-            'Nom': 'first',
-            'Prenom': 'first',
-            'Departement': 'first',
-            'Filière': 'first',
-            'Note_Finale': ['mean', 'count'],
-        }) #on groupe par étudiant
-        
-        student_avg.columns = ['Nom', 'Prenom', 'Departement', 'Filière', 
-                              'Moyenne_Generale', 'Nombre_notes']
-        
-       
-        student_avg = student_avg.sort_values('Moyenne_Generale', ascending=False)
-        
-        return student_avg.head(top_n)
+        return self._cached('get_student_ranking', lambda: self._student_ranking(top_n), top_n)
+    
+    def _student_ranking(self, top_n):
+        return self._ranking_engine().top(top_n) # sélection partielle, sans trier tous les étudiants
+    
+    def get_student_ranks(self):
+        """Rangs (compétition, dense) et percentiles de chaque étudiant, globaux et par département, filière et année"""
+        return self._cached('get_student_ranks', lambda: self._ranking_engine().ranks())
+    
+    def _ranking_engine(self):
+        """Classement des étudiants, reconstruit seulement si self.df a changé"""
+        if self._ranking is None or self._ranking[0] is not self.df:
+            self._ranking = (self.df, StudentRanking(self.df))
+        return self._ranking[1]
+    
+    def calculate_weighted_averages(self, matiere_coefficients=None, ue_credits=None, pass_mark=10.0,
+                                    compensation_floor=None, eliminatory_mark=None, retake_rule='remplace'):
+        """Moyennes pondérées matière → UE → période → étudiant et validation des UE (voir TranscriptAggregator)"""
+        aggregator = TranscriptAggregator(matiere_coefficients, ue_credits, pass_mark,
+                                          compensation_floor, eliminatory_mark, retake_rule=retake_rule)
+        arguments = (tuple(sorted((matiere_coefficients or {}).items())),
+                     tuple(sorted((ue_credits or {}).items())),
+                     pass_mark, compensation_floor, eliminatory_mark, retake_rule)
+        return self._cached('calculate_weighted_averages', lambda: aggregator.compute(self.df), *arguments)
+    
+    def simulate_scenarios(self, scenarios):
+        """Notes finales, réussites, taux par groupe et rangs sous d'autres coefficients et seuils (voir WhatIfEngine)"""
+        key = tuple(tuple(sorted(scenario.items())) for scenario in scenarios)
+        return self._cached('simulate_scenarios', lambda: WhatIfEngine(self.df).run(scenarios), key)
+    
+    def grade_histogram(self):
+        """Histogrammes cumulés des notes de la vue
+
+        Avec un cube, ils s'obtiennent en sommant les histogrammes de ses cellules retenues
+        par les filtres (mémorisés dans le cache) ; sinon ils sont construits une fois par vue.
+        """
+        cube = self.cube_for()
+        if cube is not None:
+            return self._cached('grade_histogram', lambda: cube.histogram(self.filters))
+        if self._histogram is None or self._histogram[0] is not self.df:
+            self._histogram = (self.df, GradeHistogram.from_frame(self.df))
+        return self._histogram[1]
     
     def analyze_distribution(self, groupby_column=None, group_value=None):
         """Analyse la distribution des notes"""
+        histogram = self.grade_histogram()
+        if histogram.exact:
+            # Lecture des effectifs cumulés, sans repasser sur les notes
+            if not (groupby_column and group_value):
+                return histogram.distribution()
+            if groupby_column in histogram.groups:
+                return histogram.distribution(groupby_column, group_value)
+        
         if groupby_column and group_value:
             data = self.df[self.df[groupby_column] == group_value]['Note_Finale'] #Filtrer les données pour le groupe spécifié
         else:
@@ -113,17 +268,24 @@ class DataAnalyzer:
     
     def compare_groups(self, group_column='Departement'):
         """Compare les performances entre groupes"""
-        comparison = self.df.groupby(group_column).agg({
-            'Note_Finale': ['mean', 'median', 'std', 'count', 'min', 'max', 'var'],
-            'Reussite_Bool': 'mean',
-            'Note_Devoir': 'mean',
-            'Note_Examen': 'mean'
-        }).round(2)
-        
-        comparison.columns = ['Moyenne_Finale', 'Mediane', 'Ecart_type', 'Count',
-                              'Min', 'Max', 'Variance',
-                            'Taux_reussite', 'Moyenne_Devoir', 'Moyenne_Examen']
-        comparison['Taux_reussite'] = comparison['Taux_reussite'].apply(lambda x: np.ceil(float(x) * 100))
-        
-        
-        return comparison
\ No newline at end of file
+        return self._cached('compare_groups', lambda: self._compare_groups(group_column), group_column)
+    
+    def compare_groups_intervals(self, group_column='Departement', n_resamples=DEFAULT_RESAMPLES,
+                                 confidence=DEFAULT_CONFIDENCE, seed=0, n_workers=1):
+        """Intervalles de confiance bootstrap de la moyenne, de la médiane et du taux de réussite par groupe (voir GroupBootstrap)"""
+        # Le résultat ne dépend pas de n_workers (une graine par groupe)
+        return self._cached('compare_groups_intervals',
+                            lambda: GroupBootstrap(self.df, group_column).intervals(n_resamples, confidence, seed, n_workers),
+                            group_column, n_resamples, confidence, seed)
+    
+    def test_significance(self, group_columns=None, alpha=DEFAULT_ALPHA):
+        """ANOVA, Kruskal–Wallis, khi-deux des réussites et comparaisons par paires (Holm) par regroupement (voir SignificanceTests)"""
+        key = tuple(group_columns) if group_columns else None
+        return self._cached('test_significance', lambda: SignificanceTests(self.df, group_columns).run(alpha),
+                            key, alpha)
+    
+    def _compare_groups(self, group_column):
+        # Requête Query : agrégats du cube si la vue s'y prête, sinon des lignes (notes agrégées en float64) ;
+        # exécutée sans le cache des requêtes, le tableau final est déjà mémorisé sous 'compare_groups'
+        results = self.query().group_by(group_column).agg(**COMPARISON_AGGREGATES)._execute()
+        return self.comparison_from_cube(results)
\ No newline at end of file
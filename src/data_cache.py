@@ -0,0 +1,115 @@
+import hashlib
+import json
+import pandas as pd
+from pathlib import Path
+
+CACHE_DIR_NAME = '.cache'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class DataCache:
+    """Cache Parquet des données nettoyées, stocké à côté du fichier source"""
+
+    def __init__(self, source_path, version):
+        self.source_path = Path(source_path)
+        self.version = version
+        self.cache_dir = self.source_path.parent / CACHE_DIR_NAME
+        self.manifest_path = self.cache_dir / f"{self.source_path.name}.json"
+
+    def _read_manifest(self):
+        """Lit le manifeste du cache (None s'il est absent ou illisible)"""
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _hash_content(self):
+        """Empreinte du contenu du fichier source, lue par blocs"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.source_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def fingerprint(self):
+        """Clé du cache : contenu, taille et date de modification de la source + version du nettoyage"""
+        stat = self.source_path.stat()
+        manifest = self._read_manifest()
+        if (manifest and manifest.get('size') == stat.st_size
+                and manifest.get('mtime_ns') == stat.st_mtime_ns):
+            # Taille et date inchangées : on réutilise l'empreinte du contenu déjà calculée
+            content_hash = manifest['content_hash']
+        else:
+            content_hash = self._hash_content()
+
+        key = f"{content_hash}:{stat.st_size}:{stat.st_mtime_ns}:{self.version}"
+        return {
+            'key': hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest(),
+            'content_hash': content_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'version': self.version
+        }
+
+    def _data_path(self, key):
+        return self.cache_dir / f"{self.source_path.name}.{key[:16]}.parquet"
+
+    def _rejections_path(self, key):
+        return self.cache_dir / f"{self.source_path.name}.{key[:16]}.rejets.parquet"
+
+    def load(self, columns=None, filters=None):
+        """Charge les données nettoyées (éventuellement certaines colonnes) si le cache correspond à la source, sinon None
+
+        filters {colonne: valeurs} : seules les lignes retenues sont lues dans le fichier Parquet.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+
+        fingerprint = self.fingerprint()
+        data_path = self._data_path(fingerprint['key'])
+        if manifest.get('key') != fingerprint['key'] or not data_path.exists():
+            return None
+
+        try:
+            predicates = [(col, 'in', list(values)) for col, values in (filters or {}).items()]
+            return pd.read_parquet(data_path, columns=columns, filters=predicates or None)
+        except Exception as e:
+            print(f"⚠️  Cache illisible, rechargement depuis la source : {e}")
+            return None
+
+    def load_rejections(self):
+        """Relit la table des rejets de validation associée au cache (None si absente)"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        rejections_path = self._rejections_path(manifest['key'])
+        if not rejections_path.exists():
+            return None
+        return pd.read_parquet(rejections_path)
+
+    def save(self, df, rejections=None):
+        """Écrit les données nettoyées (et les rejets de validation) dans le cache et remplace l'ancienne version"""
+        try:
+            fingerprint = self.fingerprint()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            data_path = self._data_path(fingerprint['key'])
+            df.to_parquet(data_path)
+            current = {data_path}
+            if rejections is not None:
+                rejections_path = self._rejections_path(fingerprint['key'])
+                rejections.to_parquet(rejections_path, index=False)
+                current.add(rejections_path)
+
+            # Supprimer les versions obsolètes pour ce fichier source
+            for old_path in self.cache_dir.glob(f"{self.source_path.name}.*.parquet"):
+                if old_path not in current:
+                    old_path.unlink()
+
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(fingerprint, f, indent=2)
+            return True
+        except Exception as e:
+            print(f"⚠️  Impossible d'écrire le cache : {e}")
+            return False
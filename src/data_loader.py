@@ -1,63 +1,549 @@
+import glob
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import unquote
+from urllib.request import urlopen
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+from src.accumulators import BasicStatisticsAccumulator
+from src.data_cache import DataCache
+from src.data_store import DataStore, concat_frames
+from src.deduplicator import FrameRowSource, RowDeduplicator
+from src.data_validator import DataValidator
+from src.star_schema import StarSchema
+
+# Version des règles de nettoyage : à incrémenter dès que clean_data change,
+# pour invalider les caches existants
+CLEANING_VERSION = 2
+
+# Nombre de lignes par bloc en lecture par blocs
+CHUNK_SIZE = 100_000
+
+# Nombre maximal de fichiers lus en parallèle (jeu de données multi-fichiers)
+MAX_READ_WORKERS = 8
+
+# Schéma déclaré de notes_epl.csv : types compacts appliqués dès la lecture
+SCHEMA = {
+    'ID_Etudiant': 'category',
+    'Nom': 'category',
+    'Prenom': 'category',
+    'Departement': 'category',
+    'Grade': 'category',
+    'Annee_etude': 'int8',
+    'Filière': 'category',
+    'Code_UE': 'category',
+    'Nom_UE': 'category',
+    'Code_Matiere': 'category',
+    'Matiere': 'category',
+    'Enseignant': 'category',
+    'Note_Devoir': 'float32',
+    'Note_Examen': 'float32',
+    'Note_Finale': 'float32',
+    'Reussite': 'bool',
+    'Session': 'category',
+    'Coefficient_Devoir': 'float32',
+    'Coefficient_Examen': 'float32',
+}
+
+DATE_COLUMNS = ['Date_Devoir', 'Date_Examen']
+
+# Dictionnaire UE/matière, relatif au dossier data/ du fichier source
+DICTIONARY_RELATIVE_PATH = Path('processed') / 'dictionnaire_ue_matiere.csv'
+
+# Colonnes calculées par clean_data, avec la colonne source dont elles dérivent
+DERIVED_COLUMNS = {
+    'Reussite_Bool': 'Note_Finale',
+    'Categorie_Note': 'Note_Finale',
+}
+
+# Colonnes nécessaires à chaque analyse de DataAnalyzer (hors colonne de regroupement)
+ANALYSIS_COLUMNS = {
+    'calculate_basic_statistics': ['Note_Finale', 'Departement', 'Filière', 'Nom_UE', 'Matiere', 'Enseignant'],
+    'calculate_success_rate': ['Reussite_Bool', 'Note_Finale'],
+    'calculate_correlation': ['Note_Devoir', 'Note_Examen', 'Note_Finale'],
+    'get_student_ranking': ['ID_Etudiant', 'Nom', 'Prenom', 'Departement', 'Filière', 'Note_Finale'],
+    'analyze_distribution': ['Note_Finale'],
+    'compare_groups': ['Note_Finale', 'Reussite_Bool', 'Note_Devoir', 'Note_Examen'],
+}
+
+# Équivalents acceptant les valeurs manquantes (avant dropna)
+NULLABLE_TYPES = {'bool': 'boolean', 'int8': 'Int8'}
+
+# Extensions des exports compressés et codec correspondant (mêmes noms pour pandas et Arrow)
+COMPRESSION_CODECS = {'.gz': 'gzip', '.zst': 'zstd'}
+CSV_PATTERNS = ['*.csv'] + [f"*.csv{extension}" for extension in COMPRESSION_CODECS]
+
+# Moteur de lecture CSV : lecteur multithread d'Arrow si disponible, sinon moteur C de pandas
+DEFAULT_ENGINE = 'pyarrow' if pa is not None else 'c'
+
+
+def schema_dtypes(columns, nullable=False):
+    """Retourne les types du schéma pour les colonnes présentes"""
+    dtypes = {}
+    for col in columns:
+        if col in SCHEMA:
+            dtype = SCHEMA[col]
+            dtypes[col] = NULLABLE_TYPES.get(dtype, dtype) if nullable else dtype
+    return dtypes
+
+
+def compression_codec(name):
+    """Codec de compression déduit de l'extension (None pour un CSV non compressé)"""
+    return COMPRESSION_CODECS.get(Path(str(name)).suffix.lower())
+
+
+def arrow_column_types():
+    """Schéma équivalent en types Arrow (catégories -> dictionnaires, dates -> timestamps)"""
+    arrow_types = {
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'float32': pa.float32(),
+        'int8': pa.int8(),
+        'bool': pa.bool_(),
+    }
+    column_types = {col: arrow_types[dtype] for col, dtype in SCHEMA.items()}
+    for col in DATE_COLUMNS:
+        column_types[col] = pa.timestamp('us')
+    return column_types
+
+
+def read_csv_arrow(source, columns=None):
+    """Lit un CSV avec le lecteur multithread d'Arrow, décodé directement vers le schéma compact
+    
+    Les colonnes catégorielles arrivent en dictionnaires Arrow ; leurs catégories sont
+    triées comme le ferait astype('category'), pour que l'ordre des regroupements ne change pas.
+    Une colonne booléenne/entière avec des valeurs manquantes reste en object/float64,
+    la conversion définitive se fait dans clean_data après dropna.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        column_types=arrow_column_types(),
+        include_columns=list(columns) if columns is not None else None,
+        strings_can_be_null=True
+    )
+    if isinstance(source, str) and source.startswith(('http://', 'https://')):
+        # Décompression à la volée du flux téléchargé
+        with urlopen(source) as f:
+            stream = pa.input_stream(f, compression=compression_codec(source))
+            table = pa_csv.read_csv(stream, convert_options=convert_options)
+    else:
+        # Un chemin .csv.gz / .csv.zst est décompressé en flux par Arrow (extension détectée)
+        table = pa_csv.read_csv(source, convert_options=convert_options)
+
+    df = table.to_pandas()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+
+def read_csv_preview(source, nrows=5, engine=DEFAULT_ENGINE, compression='infer'):
+    """Premières lignes d'un CSV pour un aperçu (avec Arrow, seul le premier bloc est décodé)
+    
+    Pour un fichier ouvert (upload), la compression ne peut pas être déduite du chemin :
+    la passer explicitement, par ex. compression_codec(uploaded_file.name).
+    """
+    if compression == 'infer':
+        compression = compression_codec(source) if isinstance(source, (str, Path)) else None
+    if engine == 'pyarrow' and pa is not None:
+        reader = pa_csv.open_csv(pa.input_stream(source, compression=compression))
+        return reader.read_next_batch().to_pandas().head(nrows)
+    return pd.read_csv(source, encoding='utf-8', nrows=nrows, compression=compression)
+
+
+def apply_schema(df):
+    """Convertit un DataFrame déjà chargé vers les types compacts du schéma"""
+    for col, dtype in schema_dtypes(df.columns).items():
+        if str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def required_columns(columns=None, analyses=None):
+    """Colonnes à charger pour une liste explicite et/ou des analyses
+    
+    Une analyse est un nom de méthode de DataAnalyzer, ou un couple
+    (méthode, colonne de regroupement), par ex. ('compare_groups', 'Enseignant').
+    """
+    required = list(columns or [])
+    for analysis in analyses or []:
+        name, group_column = analysis if isinstance(analysis, tuple) else (analysis, None)
+        if name not in ANALYSIS_COLUMNS:
+            raise ValueError(f"Analyse inconnue : {name}")
+        required += ANALYSIS_COLUMNS[name]
+        if group_column:
+            required.append(group_column)
+    return list(dict.fromkeys(required))
+
+
+def add_derived_columns(df, columns=None):
+    """Calcule les colonnes dérivées demandées (toutes par défaut) à partir de Note_Finale"""
+    columns = DERIVED_COLUMNS if columns is None else [col for col in columns if col in DERIVED_COLUMNS]
+    if 'Note_Finale' not in df.columns:
+        return df
+    if 'Reussite_Bool' in columns:
+        df['Reussite_Bool'] = df['Note_Finale'] >= 10
+    if 'Categorie_Note' in columns:
+        df['Categorie_Note'] = pd.cut(df['Note_Finale'], 
+                                    bins=[0, 8, 10, 12, 14, 16, 20],
+                                    labels=['Insuffisant', 'Faible', 'Passable', 
+                                           'Assez Bien', 'Bien', 'Très Bien']) #Catégoriser les notes
+    return df
+
 
 class DataLoader:
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
+    def __init__(self, file_path, engine=DEFAULT_ENGINE):
+        self.file_path = Path(file_path) if file_path is not None else None
+        self.engine = engine  # 'pyarrow' (lecture multithread) ou 'c' (moteur pandas)
         self.data = None
+        self.rejections = None  # Table des rejets de la validation (ligne, règle, colonne, valeur)
+        self.validator = DataValidator(self._dictionary_path())
     
-    def load_data(self):
-        """Charge les données depuis le fichier CSV"""
+    def _dictionary_path(self):
+        """Chemin du dictionnaire UE/matière associé au fichier source (None si inconnu)"""
+        if self.file_path is None:
+            return None
+        return self.file_path.parent.parent / DICTIONARY_RELATIVE_PATH
+    
+    def load_data(self, filters=None, max_workers=MAX_READ_WORKERS):
+        """Charge les données depuis le fichier CSV, ou depuis un dossier / motif de fichiers
+        
+        Pour un jeu multi-fichiers partitionné à la Hive (Departement=.../Session=.../*.csv),
+        les filtres portant sur des colonnes de partition écartent les fichiers avant lecture ;
+        les fichiers retenus sont lus en parallèle puis concaténés une seule fois.
+        """
         try:
-            self.data = pd.read_csv(self.file_path, encoding='utf-8')
+            if self.file_path.is_file():
+                self.data = self._read_csv(self.file_path)
+                if filters:
+                    self.data = self.data[self._filter_mask(self.data, filters)]
+            else:
+                self.data = self._read_dataset(filters, max_workers)
             print(f"✅ Données chargées : {len(self.data)} lignes, {self.data.shape[1]} colonnes")
             return self.data
         except Exception as e:
             print(f"❌ Erreur lors du chargement : {e}")
             return None
     
+    def source_files(self):
+        """Fichiers CSV (éventuellement compressés) désignés par file_path (fichier, dossier parcouru récursivement ou motif glob)"""
+        if self.file_path.is_file():
+            return [self.file_path]
+        if self.file_path.is_dir():
+            return sorted(path for pattern in CSV_PATTERNS for path in self.file_path.rglob(pattern))
+        return sorted(Path(path) for path in glob.glob(str(self.file_path), recursive=True))
+    
+    def _partition_values(self, path):
+        """Valeurs de partition lues dans le chemin (segments `colonne=valeur`)"""
+        root = self.file_path if self.file_path.is_dir() else Path()
+        try:
+            parts = path.relative_to(root).parts[:-1]
+        except ValueError:
+            parts = path.parts[:-1]
+        values = {}
+        for part in parts:
+            if '=' in part:
+                column, value = part.split('=', 1)
+                values[unquote(column)] = unquote(value)
+        return values
+    
+    def _read_dataset(self, filters=None, max_workers=MAX_READ_WORKERS, columns=None):
+        """Lit un jeu multi-fichiers en parallèle, en écartant les partitions exclues par les filtres"""
+        filters = {col: (values if isinstance(values, (list, tuple, set)) else [values])
+                   for col, values in (filters or {}).items()}
+        
+        files = self.source_files()
+        selected = []
+        for path in files:
+            partitions = self._partition_values(path)
+            if all(str(value) in {str(v) for v in filters[col]}
+                   for col, value in partitions.items() if col in filters):
+                selected.append((path, partitions))
+        if not selected:
+            raise FileNotFoundError(f"Aucun fichier CSV correspondant à {self.file_path}")
+        
+        def read_file(item):
+            path, partitions = item
+            df = self._read_csv(path, columns=columns)
+            for col, value in partitions.items():
+                if col not in df.columns:
+                    df[col] = pd.Categorical([value] * len(df))
+                    if col in SCHEMA and SCHEMA[col] != 'category':
+                        df[col] = df[col].astype(str).astype(SCHEMA[col])
+            return df
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(read_file, selected))
+        
+        df = concat_frames(frames, ignore_index=True)
+        # Filtres restants (colonnes hors partitions) appliqués sur les lignes
+        row_filters = {col: values for col, values in filters.items() if col in df.columns}
+        if row_filters:
+            df = df[self._filter_mask(df, row_filters)]
+        print(f"📁 {len(selected)} fichier(s) lu(s) sur {len(files)}")
+        return df
+    
+    def _filter_mask(self, df, filters):
+        """Masque des lignes dont les colonnes prennent l'une des valeurs demandées"""
+        mask = np.ones(len(df), dtype=bool)
+        for col, values in filters.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            mask &= df[col].isin(values).to_numpy()
+        return mask
+    
+    def _read_csv(self, source, columns=None):
+        """Lit un CSV en appliquant le schéma compact (uniquement les colonnes demandées)"""
+        header = pd.read_csv(source, encoding='utf-8', nrows=0).columns
+        if columns is not None:
+            header = [col for col in header if col in columns]
+        if self.engine == 'pyarrow' and pa is not None:
+            try:
+                return read_csv_arrow(str(source) if isinstance(source, Path) else source, header)
+            except pa.ArrowInvalid as e:
+                # Valeur non convertible vers le schéma : on laisse pandas la traiter
+                print(f"⚠️  Lecture Arrow impossible, utilisation du moteur pandas : {e}")
+        parse_dates = [col for col in DATE_COLUMNS if col in header]
+        try:
+            return pd.read_csv(source, encoding='utf-8',
+                               usecols=header,
+                               dtype=schema_dtypes(header),
+                               parse_dates=parse_dates)
+        except ValueError:
+            # Valeurs manquantes dans une colonne booléenne/entière : types nullables,
+            # la conversion définitive se fait dans clean_data après dropna
+            return pd.read_csv(source, encoding='utf-8',
+                               usecols=header,
+                               dtype=schema_dtypes(header, nullable=True),
+                               parse_dates=parse_dates)
+    
     def clean_data(self):
         """Nettoie et prépare les données"""
         if self.data is None:
             print("❌ Aucune donnée à nettoyer")
             return None
         
-        # Créer une copie
-        df = self.data.copy()
-        
-        # 1. Supprimer les doublons
-        df = df.drop_duplicates()
-        print(f"📊 Après suppression des doublons : {len(df)} lignes")
-        
-        # 2. Vérifier les valeurs manquantes
-        missing_values = df.isnull().sum()
-        if missing_values.any(): 
-            print("⚠️  Valeurs manquantes trouvées :")
-            print(missing_values[missing_values > 0]) # Afficher uniquement les colonnes avec des valeurs manquantes
-            df = df.dropna()  # Supprimer les lignes avec des valeurs manquantes
-        
-        # 3. Convertir les types de données
+        # Le filtrage renvoie déjà un nouveau DataFrame : pas de copie préalable
+        self.rejections = None
+        self.data = self._clean_frame(self.data)
+        print("✅ Données nettoyées avec succès")
+        return self.data
+    
+    def _clean_frame(self, df, verbose=True, deduplicate=True, derived_columns=None):
+        """Applique les règles de nettoyage à un DataFrame (complet ou bloc) et enregistre les rejets"""
+        # 1. Convertir les notes en numérique (valeurs invalides -> NaN, signalées comme manquantes)
         numeric_columns = ['Note_Devoir', 'Note_Examen', 'Note_Finale']
         for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce') # Convertir en numérique, forcer les erreurs en NaN
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+                df = df.assign(**{col: pd.to_numeric(df[col], errors='coerce')}) # Convertir en numérique, forcer les erreurs en NaN
+        
+        # 2. Évaluer toutes les règles de validation en une passe
+        error_mask, rejections = self.validator.validate(df, check_duplicates=deduplicate)
+        self.rejections = rejections if self.rejections is None else pd.concat([self.rejections, rejections], ignore_index=True)
+        if verbose and not rejections.empty:
+            print("⚠️  Contrôles de validation :")
+            print(DataValidator.summarize(rejections).to_string(index=False))
         
-        # 4. Filtrer les notes invalides
-        df = df[(df['Note_Finale'] >= 0) & (df['Note_Finale'] <= 20)] #On ne garde que les notes entre 0 et 20
+        # 3. Écarter les lignes en erreur : doublons, valeurs manquantes, Note_Finale hors [0, 20]
+        df = df[~error_mask]
+        if verbose:
+            print(f"📊 Après suppression des lignes invalides : {len(df)} lignes")
+        
+        # 4. Convertir vers les types compacts (category, float32, int8, bool)
+        df = apply_schema(df)
         
         # 5. Ajouter des colonnes calculées
-        if 'Note_Finale' in df.columns:
-            df['Reussite_Bool'] = df['Note_Finale'] >= 10
-            df['Categorie_Note'] = pd.cut(df['Note_Finale'], 
-                                        bins=[0, 8, 10, 12, 14, 16, 20],
-                                        labels=['Insuffisant', 'Faible', 'Passable', 
-                                               'Assez Bien', 'Bien', 'Très Bien']) #Catégoriser les notes
-        
-        self.data = df
-        print("✅ Données nettoyées avec succès")
+        return add_derived_columns(df, derived_columns)
+    
+    def load_data_chunked(self, chunksize=CHUNK_SIZE, output_dir=None, key_columns=None):
+        """Lit et nettoie le CSV par blocs de taille fixe (mémoire bornée par la taille du bloc)
+        
+        Sans output_dir, les blocs nettoyés sont concaténés en un DataFrame compact ;
+        avec output_dir, chaque bloc est écrit comme une partie d'un DataStore sur disque.
+        Les doublons sont supprimés entre blocs par empreintes (lignes entières ou
+        clé naturelle `key_columns`, par ex. ['ID_Etudiant', 'Code_Matiere', 'Session']).
+        """
+        if output_dir is not None:
+            source = DataStore(output_dir)
+            source.clear()
+        else:
+            source = FrameRowSource()
+        deduplicator = RowDeduplicator(key_columns)
+        statistics = BasicStatisticsAccumulator()
+        self.rejections = None
+        
+        rows_read = 0
+        rows_kept = 0
+        try:
+            for chunk in self._read_csv_chunks(self.file_path, chunksize):
+                rows_read += len(chunk)
+                chunk = self._clean_frame(chunk, verbose=False)
+                chunk = deduplicator.drop_duplicates(chunk, source)
+                rows_kept += len(chunk)
+                if len(chunk) == 0:
+                    continue  # bloc entièrement dédoublonné ou rejeté : aucune partie vide
+                if isinstance(source, DataStore):
+                    source.write_part(chunk)
+                    statistics.update(chunk)
+                else:
+                    source.append(chunk)
+        except Exception as e:
+            print(f"❌ Erreur lors du chargement par blocs : {e}")
+            return None
+        
+        print(f"✅ Lecture par blocs : {rows_read} lignes lues, {rows_kept} lignes conservées")
+        if isinstance(source, DataStore):
+            source.save_deduplicator(deduplicator)
+            source.save_statistics(statistics)
+            self.data = None
+            return source
+        
+        self.data = concat_frames(source.frames)
+        return self.data
+    
+    def append_delta(self, delta_path, store_dir, key_columns=None):
+        """Valide, nettoie et ajoute un fichier de nouvelles notes à un DataStore existant
+        
+        Seul le delta est lu : les doublons sont écartés grâce à l'état de déduplication
+        du stockage, et les statistiques descriptives sont mises à jour par fusion, sans
+        relire l'historique.
+        """
+        store = DataStore(store_dir)
+        try:
+            delta = self._read_csv(delta_path)
+        except Exception as e:
+            print(f"❌ Erreur lors du chargement du delta : {e}")
+            return None
+        
+        # 1. Valider la structure du delta par rapport à l'historique
+        if len(store) > 0:
+            expected = store.columns()
+            raw_expected = [col for col in expected if col not in DERIVED_COLUMNS]
+            missing = [col for col in raw_expected if col not in delta.columns]
+            if missing:
+                print(f"❌ Colonnes manquantes dans le delta : {', '.join(missing)}")
+                return None
+            delta = delta[raw_expected]
+        
+        # 2. Nettoyer puis écarter les lignes déjà présentes
+        rows_read = len(delta)
+        self.rejections = None
+        delta = self._clean_frame(delta, verbose=False)
+        try:
+            deduplicator = store.load_deduplicator(key_columns)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+        delta = deduplicator.drop_duplicates(delta, store)
+        
+        # 3. Ajouter la partie et mettre à jour l'état du stockage
+        if len(delta) > 0:
+            statistics = store.load_statistics()  # avant write_part : une reconstruction ne doit pas inclure le delta
+            store.write_part(delta)
+            statistics.update(delta)
+            store.save_statistics(statistics)
+        store.save_deduplicator(deduplicator)
+        
+        print(f"✅ Delta ajouté : {rows_read} lignes lues, {len(delta)} nouvelles lignes")
+        return delta
+    
+    def _read_csv_chunks(self, source, chunksize):
+        """Itère sur les blocs d'un CSV typés selon le schéma"""
+        columns = pd.read_csv(source, encoding='utf-8', nrows=0).columns
+        parse_dates = [col for col in DATE_COLUMNS if col in columns]
+        # Types nullables : un bloc peut contenir des valeurs manquantes, la conversion
+        # définitive se fait bloc par bloc après dropna
+        return pd.read_csv(source, encoding='utf-8',
+                           dtype=schema_dtypes(columns, nullable=True),
+                           parse_dates=parse_dates,
+                           chunksize=chunksize)
+    
+    def load_clean_data(self, use_cache=True):
+        """Charge les données nettoyées, depuis le cache Parquet si la source n'a pas changé"""
+        # Le cache n'est tenu que pour un fichier unique
+        cache = DataCache(self.file_path, CLEANING_VERSION) if use_cache and self.file_path.is_file() else None
+
+        if cache is not None:
+            cached = cache.load()
+            if cached is not None:
+                self.data = cached
+                self.rejections = cache.load_rejections()
+                print(f"⚡ Données chargées depuis le cache : {len(self.data)} lignes, {self.data.shape[1]} colonnes")
+                return self.data
+
+        if self.load_data() is None:
+            return None
+        df = self.clean_data()
+
+        if cache is not None and df is not None:
+            cache.save(df, self.rejections)
+        return df
+    
+    def load_columns(self, columns=None, analyses=None, use_cache=True, filters=None):
+        """Charge uniquement les colonnes nécessaires (liste explicite et/ou analyses)
+        
+        Avec le cache, les colonnes sont lues directement dans le fichier Parquet (qui est
+        construit une fois si besoin). Sans cache, seules ces colonnes sont lues dans le CSV
+        et les colonnes dérivées sont calculées à la demande ; la suppression des doublons,
+        qui exige des lignes complètes, n'est alors pas appliquée.
+        Les filtres {colonne: valeurs} sont appliqués à la lecture (Parquet, partitions).
+        """
+        filters = {col: (values if isinstance(values, (list, tuple, set)) else [values])
+                   for col, values in (filters or {}).items()}
+        requested = required_columns(list(columns or []) + list(filters), analyses)
+        
+        if use_cache and self.file_path.is_file():
+            cache = DataCache(self.file_path, CLEANING_VERSION)
+            projected = cache.load(columns=requested, filters=filters)
+            if projected is None and self.load_clean_data() is not None:
+                projected = self.data.loc[self._filter_mask(self.data, filters), requested]
+            if projected is not None:
+                self.data = projected
+                print(f"✅ Colonnes chargées : {', '.join(requested)} ({len(self.data)} lignes)")
+                return self.data
+        
+        # Lecture directe du CSV : colonnes sources des colonnes dérivées + Note_Finale (filtre 0-20)
+        sources = [DERIVED_COLUMNS[col] for col in requested if col in DERIVED_COLUMNS]
+        raw_columns = [col for col in requested if col not in DERIVED_COLUMNS] + sources + ['Note_Finale']
+        raw_columns = list(dict.fromkeys(raw_columns))
+        try:
+            if self.file_path.is_file():
+                df = self._read_csv(self.file_path, columns=raw_columns)
+            else:
+                df = self._read_dataset(filters, columns=raw_columns)
+        except Exception as e:
+            print(f"❌ Erreur lors du chargement : {e}")
+            return None
+        
+        df = self._clean_frame(df, verbose=False, deduplicate=False, derived_columns=requested)
+        if filters:
+            df = df[self._filter_mask(df, filters)]
+        self.data = df[requested]
+        print(f"✅ Colonnes chargées : {', '.join(requested)} ({len(self.data)} lignes)")
         return self.data
     
+    def to_star_schema(self, dictionary_path=None):
+        """Découpe les données nettoyées en table de faits et dimensions (étudiants, matières, enseignants)"""
+        if self.data is None:
+            print("❌ Aucune donnée à découper")
+            return None
+        
+        if dictionary_path is None:
+            dictionary_path = self._dictionary_path()
+        schema = StarSchema.from_frame(self.data, dictionary_path)
+        
+        memory = schema.memory_usage()
+        print(f"⭐ Schéma en étoile : {len(schema.facts)} faits ({memory['faits'] / len(schema.facts):.0f} octets/ligne), "
+              f"{len(schema.students)} étudiants, {len(schema.courses)} matières, {len(schema.teachers)} enseignants")
+        return schema
+    
     def get_summary(self):
         """Affiche un résumé des données"""
         if self.data is None:
@@ -0,0 +1,141 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from pathlib import Path
+from pandas.api.types import union_categoricals
+
+from src.accumulators import BasicStatisticsAccumulator
+from src.deduplicator import RowDeduplicator
+
+
+def concat_frames(frames, ignore_index=False):
+    """Concatène des blocs en conservant les colonnes catégorielles
+
+    pd.concat convertit en object les catégories qui diffèrent d'un bloc à l'autre ;
+    on aligne donc d'abord chaque colonne sur l'union des catégories.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame()
+    # Un bloc vide (ex. entièrement dédoublonné) n'apporte que des catégories vides, de type quelconque
+    frames = [frame for frame in frames if len(frame) > 0] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+
+    first = frames[0]
+    for col in first.columns:
+        if not isinstance(first[col].dtype, pd.CategoricalDtype):
+            continue
+        dtypes = [frame[col].dtype for frame in frames]
+        if all(dtype == dtypes[0] for dtype in dtypes):
+            continue
+        if any(not isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        categories = union_categoricals(
+            [pd.Categorical([], categories=dtype.categories) for dtype in dtypes]
+        ).categories
+        frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+
+    return pd.concat(frames, ignore_index=ignore_index)
+
+
+class DataStore:
+    """Stockage partitionné des données nettoyées : un fichier Parquet par partie"""
+
+    PART_PATTERN = 'part-*.parquet'
+    DEDUP_DIR = 'dedup'
+    STATISTICS_FILE = 'statistiques.npz'
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def parts(self):
+        """Liste ordonnée des fichiers de partie"""
+        return sorted(self.root.glob(self.PART_PATTERN))
+
+    def clear(self):
+        """Supprime toutes les parties existantes et l'état associé"""
+        for path in self.parts():
+            path.unlink()
+        (self.root / self.STATISTICS_FILE).unlink(missing_ok=True)
+        if (self.root / self.DEDUP_DIR).exists():
+            shutil.rmtree(self.root / self.DEDUP_DIR)
+
+    def write_part(self, df):
+        """Ajoute une partie au stockage et retourne son chemin"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"part-{len(self.parts()):05d}.parquet"
+        df.to_parquet(path, index=False)
+        return path
+
+    def columns(self):
+        """Colonnes des parties, lues dans le schéma Parquet (sans lire de lignes)"""
+        parts = self.parts()
+        return pq.read_schema(parts[0]).names if parts else []
+
+    def iter_parts(self, columns=None):
+        """Itère sur les parties (une seule en mémoire à la fois)"""
+        for path in self.parts():
+            yield pd.read_parquet(path, columns=columns)
+
+    def read(self, columns=None):
+        """Charge toutes les parties en un seul DataFrame (index = position globale de la ligne)"""
+        return concat_frames(list(self.iter_parts(columns)), ignore_index=True)
+
+    def load_deduplicator(self, key_columns=None):
+        """Recharge l'état de déduplication, ou le reconstruit à partir des parties
+        
+        key_columns doit correspondre à la clé de l'état sauvegardé (None : clé sauvegardée).
+        """
+        path = self.root / self.DEDUP_DIR
+        if (path / RowDeduplicator.STATE_FILE).exists():
+            deduplicator = RowDeduplicator.load(path)
+            if key_columns and list(key_columns) != (deduplicator.key_columns or []):
+                raise ValueError(f"Clé de déduplication {list(key_columns)} différente de celle du stockage "
+                                 f"({deduplicator.key_columns or 'lignes entières'})")
+            return deduplicator
+        deduplicator = RowDeduplicator(key_columns)
+        for part in self.iter_parts(key_columns):
+            deduplicator.register(part)
+        return deduplicator
+
+    def save_deduplicator(self, deduplicator):
+        """Écrit les nouveaux runs d'empreintes (les runs déjà sauvegardés ne sont pas réécrits)"""
+        deduplicator.save(self.root / self.DEDUP_DIR)
+
+    def load_statistics(self):
+        """Accumulateurs des statistiques descriptives, ou reconstruits à partir des parties"""
+        path = self.root / self.STATISTICS_FILE
+        if path.exists():
+            return BasicStatisticsAccumulator.load(path)
+        accumulator = BasicStatisticsAccumulator()
+        for part in self.iter_parts():
+            accumulator.update(part)
+        return accumulator
+
+    def save_statistics(self, accumulator):
+        self.root.mkdir(parents=True, exist_ok=True)
+        accumulator.save(self.root / self.STATISTICS_FILE)
+
+    def row_offsets(self):
+        """Position de la première ligne de chaque partie (lue dans les métadonnées Parquet)"""
+        counts = [pq.read_metadata(path).num_rows for path in self.parts()]
+        return np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def fetch_rows(self, ids, columns):
+        """Relit uniquement les lignes demandées (positions globales dans l'ordre des parties)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        parts = self.parts()
+        offsets = self.row_offsets()
+        part_idx = np.searchsorted(offsets, ids, side='right') - 1
+        frames = []
+        for i in np.unique(part_idx):
+            positions = ids[part_idx == i] - offsets[i]
+            part = pd.read_parquet(parts[i], columns=columns).iloc[positions]
+            frames.append(part.set_axis(ids[part_idx == i]))
+        return pd.concat(frames).loc[ids]
+
+    def __len__(self):
+        return len(self.parts())
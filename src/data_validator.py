@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Gravité des règles : les erreurs excluent la ligne, les avertissements sont seulement signalés
+ERREUR = 'erreur'
+AVERTISSEMENT = 'avertissement'
+
+NOTE_COLUMNS = ['Note_Devoir', 'Note_Examen', 'Note_Finale']
+
+REJECTION_COLUMNS = ['Ligne', 'Regle', 'Gravite', 'Colonne', 'Valeur']
+
+
+def _values(df, column):
+    """Valeurs numériques d'une colonne en float64 (NaN pour les manquantes)"""
+    return df[column].to_numpy(dtype='float64', na_value=np.nan)
+
+
+class DataValidator:
+    """Moteur de règles de validation évaluées en masques vectorisés
+
+    Toutes les règles sont évaluées en une passe sur un DataFrame (complet ou bloc) ;
+    chaque violation produit une ligne dans la table des rejets (ligne, règle, colonne, valeur).
+    """
+
+    def __init__(self, dictionary_path=None, threshold=10, tolerance=0.06):
+        self.threshold = threshold
+        self.tolerance = tolerance  # arrondi de Note_Finale à 0.1 + précision float32
+        self.known_codes = None
+        if dictionary_path is not None and Path(dictionary_path).exists():
+            dictionary = pd.read_csv(dictionary_path, encoding='utf-8', usecols=['Code_Matiere'])
+            self.known_codes = set(dictionary['Code_Matiere'].astype(str))
+
+    def _rules(self, df, check_duplicates):
+        """Génère (règle, gravité, colonne, masque) pour chaque contrôle applicable"""
+        if check_duplicates:
+            yield 'doublon', ERREUR, None, df.duplicated().to_numpy()
+
+        for col in df.columns:
+            missing = df[col].isna().to_numpy()
+            if missing.any():
+                yield 'valeur_manquante', ERREUR, col, missing
+
+        for col in NOTE_COLUMNS:
+            if col in df.columns:
+                notes = _values(df, col)
+                out_of_range = (notes < 0) | (notes > 20)
+                gravite = ERREUR if col == 'Note_Finale' else AVERTISSEMENT
+                yield 'note_hors_intervalle', gravite, col, out_of_range
+
+        columns = set(df.columns)
+        if {'Note_Devoir', 'Note_Examen', 'Note_Finale', 'Coefficient_Devoir', 'Coefficient_Examen'} <= columns:
+            expected = (_values(df, 'Note_Devoir') * _values(df, 'Coefficient_Devoir')
+                        + _values(df, 'Note_Examen') * _values(df, 'Coefficient_Examen'))
+            gap = np.abs(expected - _values(df, 'Note_Finale'))
+            yield 'note_finale_incoherente', AVERTISSEMENT, 'Note_Finale', gap > self.tolerance
+
+        if {'Coefficient_Devoir', 'Coefficient_Examen'} <= columns:
+            total = _values(df, 'Coefficient_Devoir') + _values(df, 'Coefficient_Examen')
+            yield 'coefficients_invalides', AVERTISSEMENT, 'Coefficient_Examen', np.abs(total - 1) > 1e-3
+
+        if {'Reussite', 'Note_Finale'} <= columns:
+            reussite = df['Reussite'].astype('boolean')
+            expected = df['Note_Finale'] >= self.threshold
+            mismatch = (reussite != expected).fillna(False).to_numpy(dtype=bool)
+            yield 'reussite_incoherente', AVERTISSEMENT, 'Reussite', mismatch
+
+        if self.known_codes is not None and 'Code_Matiere' in columns:
+            codes = df['Code_Matiere']
+            unknown = (~codes.astype(str).isin(self.known_codes) & codes.notna()).to_numpy()
+            yield 'matiere_inconnue', AVERTISSEMENT, 'Code_Matiere', unknown
+
+        if {'Date_Devoir', 'Date_Examen'} <= columns:
+            order = (pd.to_datetime(df['Date_Devoir'], errors='coerce')
+                     > pd.to_datetime(df['Date_Examen'], errors='coerce'))
+            yield 'dates_incoherentes', AVERTISSEMENT, 'Date_Devoir', order.to_numpy(dtype=bool)
+
+    def validate(self, df, check_duplicates=True):
+        """Évalue toutes les règles ; retourne (masque des lignes en erreur, table des rejets)"""
+        error_mask = np.zeros(len(df), dtype=bool)
+        records = []
+        for regle, gravite, colonne, mask in self._rules(df, check_duplicates):
+            if not mask.any():
+                continue
+            positions = np.flatnonzero(mask)
+            if gravite == ERREUR:
+                error_mask |= mask
+            valeurs = df[colonne].iloc[positions].astype(str).to_numpy() if colonne else ''
+            records.append(pd.DataFrame({
+                'Ligne': df.index.to_numpy()[positions],
+                'Regle': regle,
+                'Gravite': gravite,
+                'Colonne': colonne or '',
+                'Valeur': valeurs
+            }))
+
+        rejections = pd.concat(records, ignore_index=True) if records else pd.DataFrame(columns=REJECTION_COLUMNS)
+        return error_mask, compact_rejections(rejections)
+
+    @staticmethod
+    def summarize(rejections):
+        """Nombre de violations et de lignes concernées par règle"""
+        if rejections is None or rejections.empty:
+            return pd.DataFrame(columns=['Regle', 'Gravite', 'Colonne', 'Violations', 'Lignes'])
+        summary = rejections.groupby(['Regle', 'Gravite', 'Colonne'], observed=True).agg(
+            Violations=('Ligne', 'size'),
+            Lignes=('Ligne', 'nunique')
+        )
+        return summary.reset_index().sort_values('Violations', ascending=False)
+
+
+def compact_rejections(rejections):
+    """Types compacts pour la table des rejets"""
+    return rejections.astype({
+        'Ligne': 'int64',
+        'Regle': 'category',
+        'Gravite': 'category',
+        'Colonne': 'category',
+        'Valeur': 'str'
+    })
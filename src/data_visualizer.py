@@ -72,7 +72,7 @@ class DataVisualizer:
     
     def _plot_success_rate(self, ax, column):
         """Tracé du taux de réussite par catégorie"""
-        success_rate = self.df.groupby(column)['Reussite'].mean() * 100
+        success_rate = self.df.groupby(column, observed=True)['Reussite'].mean() * 100
         
         bars = ax.bar(range(len(success_rate)), success_rate.values, 
                     color=self.colors[:len(success_rate)])
@@ -159,7 +159,8 @@ class DataVisualizer:
                 values='Note_Finale', 
                 index='Departement', 
                 columns='Filière', 
-                aggfunc='mean'
+                aggfunc='mean',
+                observed=True
             ).round(1)
             
             im = ax.imshow(pivot_table.values, cmap='YlOrRd', aspect='auto')
@@ -314,7 +315,7 @@ class DataVisualizer:
             )
     
     def _add_success_rate_bars(self, fig, row, col):
-        success_rate = self.df.groupby('Filière')['Reussite'].mean() * 100
+        success_rate = self.df.groupby('Filière', observed=True)['Reussite'].mean() * 100
         fig.add_trace(
             go.Bar(
                 x=success_rate.index,
@@ -342,7 +343,7 @@ class DataVisualizer:
         fig.update_yaxes(title_text='Note Devoir', row=row, col=col)
     
     def _add_department_ranking(self, fig, row, col):
-        dept_avg = self.df.groupby('Departement')['Note_Finale'].mean().sort_values(ascending=False)
+        dept_avg = self.df.groupby('Departement', observed=True)['Note_Finale'].mean().sort_values(ascending=False)
         fig.add_trace(
             go.Bar(
                 x=dept_avg.index,
@@ -357,7 +358,7 @@ class DataVisualizer:
         fig.update_yaxes(title_text='Moyenne Note Finale', row=row, col=col)
 
     def _add_teacher_performance(self, fig, row, col):
-        teacher_avg = self.df.groupby('Enseignant')['Note_Finale'].mean().sort_values(ascending=False)
+        teacher_avg = self.df.groupby('Enseignant', observed=True)['Note_Finale'].mean().sort_values(ascending=False)
         fig.add_trace(
             go.Bar(
                 x=teacher_avg.index,
@@ -378,7 +379,8 @@ class DataVisualizer:
                 values='Note_Finale', 
                 index='Departement', 
                 columns='Filière', 
-                aggfunc='mean'
+                aggfunc='mean',
+                observed=True
             ).round(1)
             
             fig.add_trace(
@@ -467,7 +469,7 @@ class DataVisualizer:
     def _add_top_matiere(self, fig, row, col):
         """Ajoute le top 10 des matières"""
         if 'Matiere' in self.df.columns:
-            matiere_stats = self.df.groupby('Matiere').agg({
+            matiere_stats = self.df.groupby('Matiere', observed=True).agg({
                 'Note_Finale': ['mean', 'count'],
                 'Reussite': 'mean'
             }).round(2)
@@ -540,7 +542,7 @@ class DataVisualizer:
         
         # Taux de réussite par filière
         if 'Filière' in self.df.columns:
-            success_rate = self.df.groupby('Filière')['Reussite'].mean() * 100
+            success_rate = self.df.groupby('Filière', observed=True)['Reussite'].mean() * 100
             fig3 = px.bar(x=success_rate.index, y=success_rate.values,
                          title='Taux de Réussite par Filière',
                          labels={'x': 'Filière', 'y': 'Taux de Réussite (%)'})
@@ -0,0 +1,196 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class FrameRowSource:
+    """Accès par identifiant aux lignes déjà retenues et gardées en mémoire
+
+    Les identifiants sont les positions des lignes dans l'ordre d'ajout des blocs.
+    """
+
+    def __init__(self):
+        self.frames = []
+        self.offsets = [0]
+
+    def append(self, df):
+        self.frames.append(df)
+        self.offsets.append(self.offsets[-1] + len(df))
+
+    def fetch_rows(self, ids, columns):
+        """Retourne les lignes demandées (colonnes `columns`), dans l'ordre des identifiants"""
+        ids = np.asarray(ids, dtype=np.int64)
+        frame_idx = np.searchsorted(self.offsets, ids, side='right') - 1
+        parts = []
+        for i in np.unique(frame_idx):
+            positions = ids[frame_idx == i] - self.offsets[i]
+            part = self.frames[i][columns].iloc[positions]
+            parts.append(part.set_axis(ids[frame_idx == i]))
+        return pd.concat(parts).loc[ids]
+
+
+class RowDeduplicator:
+    """Déduplication entre blocs, fichiers et ajouts successifs
+
+    Chaque ligne retenue n'est représentée que par une empreinte 64 bits (toutes les
+    colonnes, ou la clé naturelle `key_columns`) et son identifiant. Les empreintes de
+    chaque bloc forment un run trié ; un run n'est fusionné qu'avec des runs plus
+    petits que lui (comme un arbre LSM), si bien que l'ajout d'un bloc ne recopie jamais
+    tout l'historique. Une empreinte déjà vue n'est qu'un candidat : les valeurs
+    sont comparées aux lignes d'origine lues via `source.fetch_rows`, pour que deux
+    lignes différentes partageant la même empreinte ne soient jamais confondues.
+    """
+
+    STATE_FILE = 'etat.npz'
+
+    def __init__(self, key_columns=None):
+        self.key_columns = list(key_columns) if key_columns else None
+        self.runs = []   # (empreintes triées, identifiants), du plus grand au plus petit
+        self.run_files = []  # fichier de chaque run sauvegardé (None : pas encore écrit)
+        self._next_run = 0
+        self.next_id = 0
+        self.collisions = 0
+
+    def __len__(self):
+        return sum(len(hashes) for hashes, _ in self.runs)
+
+    def _columns(self, df):
+        return self.key_columns or list(df.columns)
+
+    def hash_rows(self, df):
+        """Empreintes 64 bits des lignes (indépendantes des catégories de chaque bloc)"""
+        return pd.util.hash_pandas_object(df[self._columns(df)], index=False).to_numpy()
+
+    def _matches(self, hashes):
+        """Paires (ligne du bloc, identifiant déjà retenu) de même empreinte, tous runs confondus"""
+        rows, ids = [], []
+        for run_hashes, run_ids in self.runs:
+            left = np.searchsorted(run_hashes, hashes, side='left')
+            right = np.searchsorted(run_hashes, hashes, side='right')
+            counts = right - left
+            found = np.flatnonzero(counts)
+            if len(found) == 0:
+                continue
+            counts = counts[found]
+            starts = np.repeat(np.cumsum(counts) - counts, counts)
+            slots = np.repeat(left[found], counts) + np.arange(counts.sum()) - starts
+            rows.append(np.repeat(found, counts))
+            ids.append(np.asarray(run_ids[slots]))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(ids)
+
+    def drop_duplicates(self, df, source=None):
+        """Supprime les lignes déjà vues (dans le bloc ou précédemment) et enregistre les autres
+
+        Les lignes retenues reçoivent les identifiants next_id, next_id + 1, ... ;
+        l'appelant doit les ajouter à `source` dans cet ordre.
+        Sans `source`, une empreinte identique suffit à considérer la ligne comme doublon.
+        """
+        columns = self._columns(df)
+        hashes = self.hash_rows(df)
+        keep = np.ones(len(df), dtype=bool)
+
+        # 1. Doublons internes au bloc : comparaison exacte limitée aux empreintes répétées
+        repeated = pd.Series(hashes).duplicated(keep=False).to_numpy()
+        if repeated.any():
+            positions = np.flatnonzero(repeated)
+            duplicated = df[columns].iloc[positions].duplicated().to_numpy()
+            keep[positions[duplicated]] = False
+
+        # 2. Doublons avec les lignes déjà retenues
+        pair_rows, pair_ids = self._matches(hashes)
+        kept_pairs = keep[pair_rows]
+        pair_rows, pair_ids = pair_rows[kept_pairs], pair_ids[kept_pairs]
+        candidates = np.unique(pair_rows)
+        if len(candidates) > 0:
+            if source is None:
+                keep[candidates] = False
+            else:
+                keep[candidates] = ~self._verify(df, columns, candidates, pair_rows, pair_ids, source)
+
+        # 3. Enregistrer les lignes retenues
+        self._insert(hashes[keep])
+        return df[keep]
+
+    def register(self, df):
+        """Enregistre toutes les lignes sans contrôle (reconstruction à partir de données déjà dédupliquées)"""
+        self._insert(self.hash_rows(df))
+
+    def _insert(self, new_hashes):
+        """Ajoute les empreintes comme un nouveau run trié, avec des identifiants consécutifs"""
+        new_ids = np.arange(self.next_id, self.next_id + len(new_hashes), dtype=np.int64)
+        self.next_id += len(new_hashes)
+        if len(new_hashes) == 0:
+            return
+        order = np.argsort(new_hashes, kind='stable')
+        self.runs.append((new_hashes[order], new_ids[order]))
+        self.run_files.append(None)
+        self._compact()
+
+    def _compact(self):
+        """Fusionne le dernier run avec les précédents tant qu'ils ne sont pas plus grands que lui"""
+        while len(self.runs) > 1 and len(self.runs[-2][0]) <= len(self.runs[-1][0]):
+            (hashes_a, ids_a), (hashes_b, ids_b) = self.runs[-2], self.runs.pop()
+            self.run_files.pop()
+            hashes = np.concatenate([hashes_a, hashes_b])
+            order = np.argsort(hashes, kind='stable')
+            self.runs[-1] = (hashes[order], np.concatenate([ids_a, ids_b])[order])
+            self.run_files[-1] = None
+
+    def _verify(self, df, columns, candidates, pair_rows, pair_ids, source):
+        """Compare les candidats aux lignes retenues de même empreinte ; True si doublon réel"""
+        stored = source.fetch_rows(np.unique(pair_ids), columns)
+        new_values = df[columns].iloc[pair_rows].reset_index(drop=True)
+        old_values = stored.loc[pair_ids].reset_index(drop=True)
+
+        equal = np.ones(len(pair_rows), dtype=bool)
+        for col in columns:
+            a = new_values[col].astype(object)
+            b = old_values[col].astype(object)
+            equal &= ((a == b) | (a.isna() & b.isna())).to_numpy()
+
+        is_duplicate = np.zeros(len(df), dtype=bool)
+        is_duplicate[pair_rows[equal]] = True
+        is_duplicate = is_duplicate[candidates]
+        self.collisions += int((~is_duplicate).sum())
+        return is_duplicate
+
+    def save(self, directory):
+        """Sauvegarde l'état dans un dossier : un couple de fichiers .npy par run, plus un petit état
+
+        Les runs déjà écrits ne sont pas réécrits : un ajout n'écrit que le run du delta
+        (et les runs issus d'une fusion) ; les fichiers des runs fusionnés sont supprimés.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for i, (hashes, row_ids) in enumerate(self.runs):
+            if self.run_files[i] is None:
+                name = f"run-{self._next_run:05d}"
+                self._next_run += 1
+                np.save(directory / f"{name}.hashes.npy", hashes)
+                np.save(directory / f"{name}.ids.npy", row_ids)
+                self.run_files[i] = name
+        np.savez(directory / self.STATE_FILE, next_id=self.next_id, collisions=self.collisions,
+                 next_run=self._next_run, runs=np.array(self.run_files, dtype=str),
+                 key_columns=np.array(self.key_columns or [], dtype=str))
+        current = set(self.run_files)
+        for path in directory.glob('run-*.npy'):
+            if path.name.split('.')[0] not in current:
+                path.unlink()
+
+    @classmethod
+    def load(cls, directory):
+        """Recharge un état sauvegardé avec save() ; les runs sont projetés en mémoire (mmap), pas lus"""
+        directory = Path(directory)
+        state = np.load(directory / cls.STATE_FILE)
+        dedup = cls(state['key_columns'].tolist() or None)
+        dedup.run_files = state['runs'].tolist()
+        dedup.runs = [(np.load(directory / f"{name}.hashes.npy", mmap_mode='r'),
+                       np.load(directory / f"{name}.ids.npy", mmap_mode='r'))
+                      for name in dedup.run_files]
+        dedup.next_id = int(state['next_id'])
+        dedup.collisions = int(state['collisions'])
+        dedup._next_run = int(state['next_run'])
+        return dedup
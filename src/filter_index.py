@@ -0,0 +1,152 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from src.group_statistics import group_codes
+from src.result_cache import filter_signature
+
+# Colonnes indexées pour les filtres du dashboard
+INDEXED_COLUMNS = ['Departement', 'Filière', 'Annee_etude', 'Session', 'Enseignant', 'Code_UE']
+
+# Au-delà de ce nombre de valeurs, une colonne est indexée par listes de lignes plutôt que par
+# bitmaps : un bitmap coûte n_lignes / 8 octets par valeur, les listes 4 octets par ligne au total
+DENSE_MAX_VALUES = 32
+
+# Lignes copiées conservées par le cache des vues, en multiple du nombre de lignes du DataFrame
+VIEW_CACHE_FRAMES = 1
+
+
+class ColumnBitmaps:
+    """Bitmaps (1 bit par ligne, np.packbits) de chaque valeur d'une colonne de faible cardinalité"""
+
+    def __init__(self, codes, labels):
+        codes = np.asarray(codes)
+        self.labels = labels
+        self.n_rows = len(codes)
+        self.bitmaps = np.stack([np.packbits(codes == code) for code in range(len(labels))]) \
+            if len(labels) else np.zeros((0, (self.n_rows + 7) // 8), dtype=np.uint8)
+        self.present = np.packbits(codes >= 0)  # lignes dont la valeur n'est pas manquante
+        self.complete = bool((codes >= 0).all())
+
+    def mask(self, values):
+        """Bitmap des lignes dont la valeur est dans values (None : aucune ligne exclue)
+
+        On combine (OU) les bitmaps des valeurs retenues ou, s'ils sont moins nombreux,
+        ceux des valeurs exclues : au plus DENSE_MAX_VALUES / 2 bitmaps.
+        """
+        positions = self.labels.get_indexer(list(values))
+        positions = np.unique(positions[positions >= 0])
+        selected, total = len(positions), len(self.labels)
+
+        if selected == total:
+            return None if self.complete else self.present
+        if selected <= total - selected:
+            return np.bitwise_or.reduce(self.bitmaps[positions], axis=0) if selected \
+                else np.zeros_like(self.present)
+        excluded = np.setdiff1d(np.arange(total), positions)
+        return self.present & ~np.bitwise_or.reduce(self.bitmaps[excluded], axis=0)
+
+
+class ColumnRowLists:
+    """Listes triées des lignes de chaque valeur d'une colonne de forte cardinalité
+
+    Les positions sont rangées valeur par valeur dans un seul tableau (offsets de
+    chaque valeur) : la mémoire ne dépend que du nombre de lignes, pas du nombre de
+    valeurs. Le bitmap d'un filtre s'obtient en marquant les lignes des valeurs
+    retenues, ou celles des valeurs exclues si elles sont moins nombreuses.
+    """
+
+    def __init__(self, codes, labels):
+        codes = np.asarray(codes)
+        self.labels = labels
+        self.n_rows = len(codes)
+        dtype = np.int32 if self.n_rows <= np.iinfo(np.int32).max else np.int64
+        present = codes >= 0
+        self.missing = np.flatnonzero(~present).astype(dtype)
+        order = np.flatnonzero(present)
+        order = order[np.argsort(codes[order], kind='stable')]  # lignes croissantes pour chaque valeur
+        self.row_ids = order.astype(dtype)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[present], minlength=len(labels)))])
+
+    def _rows(self, positions):
+        """Lignes des valeurs aux positions données (concaténées)"""
+        if not len(positions):
+            return self.row_ids[:0]
+        return np.concatenate([self.row_ids[self.offsets[i]:self.offsets[i + 1]] for i in positions])
+
+    def mask(self, values):
+        """Bitmap des lignes dont la valeur est dans values (None : aucune ligne exclue)"""
+        positions = self.labels.get_indexer(list(values))
+        positions = np.unique(positions[positions >= 0])
+        selected, total = len(positions), len(self.labels)
+
+        if selected == total and not len(self.missing):
+            return None
+        if selected <= total - selected:
+            rows = np.zeros(self.n_rows, dtype=bool)
+            rows[self._rows(positions)] = True
+        else:
+            rows = np.ones(self.n_rows, dtype=bool)
+            rows[self.missing] = False
+            rows[self._rows(np.setdiff1d(np.arange(total), positions))] = False
+        return np.packbits(rows)
+
+
+class FilterIndex:
+    """Index des colonnes filtrables d'un DataFrame
+
+    Chaque colonne est indexée par bitmaps (ColumnBitmaps) ou, au-delà de
+    DENSE_MAX_VALUES valeurs, par listes de lignes (ColumnRowLists). Un filtre
+    {colonne: valeurs} est le ET des bitmaps obtenus pour chaque colonne. Sans
+    restriction, la vue est le DataFrame lui-même (aucune copie) ; sinon seules les
+    lignes retenues sont extraites, une fois par jeu de filtres : les vues sont gardées
+    par signature des filtres (LRU), tant que leurs lignes ne dépassent pas
+    VIEW_CACHE_FRAMES fois celles du DataFrame.
+    """
+
+    def __init__(self, df, columns=None):
+        self.df = df
+        self.columns = {}
+        for col in (columns or INDEXED_COLUMNS):
+            if col in df.columns:
+                codes, labels = group_codes(df[col])
+                index = ColumnBitmaps if len(labels) <= DENSE_MAX_VALUES else ColumnRowLists
+                self.columns[col] = index(codes, labels)
+        self._views = OrderedDict()  # signature des filtres -> vue
+        self._view_rows = 0          # lignes copiées dans les vues conservées
+
+    def mask(self, filters):
+        """Bitmap (1 bit par ligne) des lignes retenues (None si aucun filtre ne restreint les données)"""
+        combined = None
+        for col, values in (filters or {}).items():
+            if col in self.columns:
+                mask = self.columns[col].mask(values)
+            else:
+                mask = np.packbits(self.df[col].isin(list(values)).to_numpy())
+            if mask is not None:
+                combined = mask if combined is None else combined & mask
+        return combined
+
+    def rows(self, filters):
+        """Positions des lignes retenues, triées (None si aucune ligne n'est exclue)"""
+        combined = self.mask(filters)
+        if combined is None:
+            return None
+        return np.flatnonzero(np.unpackbits(combined, count=len(self.df)))
+
+    def view(self, filters):
+        """DataFrame des lignes retenues par les filtres {colonne: valeurs}"""
+        signature = filter_signature(filters)
+        if signature in self._views:
+            self._views.move_to_end(signature)
+            return self._views[signature]
+        rows = self.rows(filters)
+        if rows is None:
+            return self.df
+        view = self.df.take(rows)
+        self._views[signature] = view
+        self._view_rows += len(view)
+        while self._view_rows > VIEW_CACHE_FRAMES * len(self.df) and len(self._views) > 1:
+            _, evicted = self._views.popitem(last=False)
+            self._view_rows -= len(evicted)
+        return view
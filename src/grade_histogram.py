@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+from src.group_statistics import group_codes
+from src.quantiles import GRID_BINS, grid_bins
+
+# Regroupements pour lesquels un histogramme par groupe est tenu
+HISTOGRAM_GROUPS = ['Departement', 'Filière', 'Annee_etude', 'Nom_UE', 'Matiere', 'Enseignant', 'Session']
+
+
+class GradeHistogram:
+    """Effectifs cumulés des notes finales sur la grille 0.1, globaux et par groupe
+
+    Pour chaque groupe, le tableau cumulé (201 cases + 1) donne le nombre de notes
+    sous n'importe quelle case : le nombre de réussites à un seuil, la fréquence d'une
+    classe de notes ou la fréquence cumulée s'obtiennent par une différence de deux
+    cases, quelle que soit la taille des données. Les effectifs s'ajoutent bloc par
+    bloc (update) ; les tableaux cumulés sont recalculés au premier besoin.
+    Les lectures sont exactes tant que chaque case ne reçoit qu'une valeur (`exact`).
+    """
+
+    def __init__(self, group_columns=None):
+        self.group_columns = list(group_columns or HISTOGRAM_GROUPS)
+        self.bin_values = np.arange(GRID_BINS, dtype='float64') / 10
+        self.bin_seen = np.zeros(GRID_BINS, dtype=bool)
+        self.exact = True
+        self.counts = np.zeros(GRID_BINS, dtype=np.int64)
+        self.rows = 0                      # lignes vues, notes manquantes comprises
+        self.groups = {}                   # colonne -> (libellés, effectifs groupes x 201, lignes par groupe)
+        self._cumulative = {}
+
+    @classmethod
+    def from_frame(cls, df, group_columns=None):
+        return cls(group_columns).update(df)
+
+    @classmethod
+    def from_cells(cls, cells, histograms, bin_values, exact=True, group_columns=None):
+        """Histogrammes obtenus en sommant ceux de cellules d'agrégats (ex. cellules d'un GradeCube)
+
+        cells : une ligne par cellule avec ses colonnes de regroupement ; histograms :
+        effectifs de chaque cellule (cellules x 201). Seules les notes présentes sont
+        comptées, et seules les colonnes de cells peuvent servir de regroupement.
+        """
+        histogram = cls([col for col in (group_columns or HISTOGRAM_GROUPS) if col in cells.columns])
+        histograms = np.asarray(histograms, dtype=np.int64)
+        histogram.counts = histograms.sum(axis=0)
+        histogram.rows = int(histogram.counts.sum())
+        histogram.bin_seen = histogram.counts > 0
+        histogram.bin_values = np.where(histogram.bin_seen, bin_values, histogram.bin_values)
+        histogram.exact = exact
+        for col in histogram.group_columns:
+            codes, labels = group_codes(cells[col])
+            codes = np.asarray(codes, dtype=np.int64)
+            counts = np.zeros((len(labels), GRID_BINS), dtype=np.int64)
+            np.add.at(counts, codes[codes >= 0], histograms[codes >= 0])
+            rows = counts.sum(axis=1)
+            observed = rows > 0
+            histogram.groups[col] = (pd.Index(labels)[observed], counts[observed], rows[observed])
+        return histogram
+
+    def update(self, df):
+        """Ajoute les notes d'un bloc (chargement initial ou données ajoutées)"""
+        notes = df['Note_Finale'].to_numpy(dtype='float64')
+        valid = ~np.isnan(notes)
+        bins = np.zeros(len(notes), dtype=np.int64)
+        bins[valid], bin_values, bin_seen, exact = grid_bins(notes[valid])
+
+        # Une case doit toujours désigner la même valeur pour que les lectures restent exactes
+        shared = self.bin_seen & bin_seen
+        if not exact or not np.array_equal(self.bin_values[shared], bin_values[shared]):
+            self.exact = False
+        self.bin_values = np.where(self.bin_seen, self.bin_values, bin_values)
+        self.bin_seen |= bin_seen
+
+        self.counts += np.bincount(bins[valid], minlength=GRID_BINS)
+        self.rows += len(notes)
+        for col in self.group_columns:
+            if col in df.columns:
+                self._update_group(col, df[col], bins, valid)
+        self._cumulative = {}
+        return self
+
+    def _update_group(self, col, series, bins, valid):
+        codes, labels = group_codes(series)
+        codes = np.asarray(codes, dtype=np.int64)
+        known, counts, rows = self.groups.get(col, (pd.Index([]), np.zeros((0, GRID_BINS), dtype=np.int64),
+                                                     np.zeros(0, dtype=np.int64)))
+        new_labels = pd.Index(labels).difference(known, sort=False)
+        if len(new_labels):
+            known = known.append(new_labels)
+            counts = np.vstack([counts, np.zeros((len(new_labels), GRID_BINS), dtype=np.int64)])
+            rows = np.concatenate([rows, np.zeros(len(new_labels), dtype=np.int64)])
+        positions = known.get_indexer(labels)
+
+        grouped = codes >= 0
+        rows += np.bincount(positions[codes[grouped]], minlength=len(known))
+        keep = grouped & valid
+        counts += np.bincount(positions[codes[keep]] * GRID_BINS + bins[keep],
+                              minlength=len(known) * GRID_BINS).reshape(len(known), GRID_BINS)
+        self.groups[col] = (known, counts, rows)
+
+    def _counts(self, column=None):
+        """Effectifs cumulés (groupes x 202, 0 en tête) et lignes par groupe, calculés une fois"""
+        if column not in self._cumulative:
+            counts, rows = ((self.counts[None, :], np.array([self.rows])) if column is None
+                            else self.groups[column][1:])
+            cumulative = np.zeros((len(counts), GRID_BINS + 1), dtype=np.int64)
+            np.cumsum(counts, axis=1, out=cumulative[:, 1:])
+            self._cumulative[column] = (cumulative, rows)
+        return self._cumulative[column]
+
+    def _group(self, column=None, value=None):
+        """Effectifs cumulés et nombre de lignes d'un groupe (tout le jeu si column est None)"""
+        cumulative, rows = self._counts(column)
+        if column is None:
+            return cumulative[0], rows[0]
+        position = self.groups[column][0].get_indexer([value])[0]
+        if position < 0:
+            return np.zeros(GRID_BINS + 1, dtype=np.int64), 0
+        return cumulative[position], rows[position]
+
+    def _rank(self, threshold, side='left'):
+        """Nombre de cases dont la valeur est inférieure au seuil (ou égale avec side='right')"""
+        return np.searchsorted(self.bin_values, threshold, side=side)
+
+    def pass_count(self, threshold, column=None, value=None):
+        """Nombre de notes supérieures ou égales au seuil"""
+        cumulative, _ = self._group(column, value)
+        return int(cumulative[-1] - cumulative[self._rank(threshold)])
+
+    def pass_rate(self, threshold, column=None, value=None):
+        """Taux de réussite (%) au seuil, sur toutes les lignes du groupe (comme (notes >= seuil).mean())"""
+        _, rows = self._group(column, value)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.pass_count(threshold, column, value) / np.float64(rows) * 100
+
+    def pass_rates(self, threshold, column):
+        """Taux de réussite (%) de tous les groupes d'une colonne"""
+        cumulative, rows = self._counts(column)
+        passed = cumulative[:, -1] - cumulative[:, self._rank(threshold)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(passed / rows * 100, index=self.groups[column][0], name='Taux_reussite')
+
+    def distribution(self, column=None, value=None, bin_width=1, low=0, high=20):
+        """Fréquences par classe de largeur bin_width (mêmes clés que DataAnalyzer.analyze_distribution)"""
+        cumulative, rows = self._group(column, value)
+        edges = np.arange(low, high + bin_width, bin_width)
+        edges = edges[edges <= high]
+        positions = self._rank(edges)
+        # Dernière classe fermée à droite, comme np.histogram
+        positions[-1] = self._rank(edges[-1], side='right')
+        hist = np.diff(cumulative[positions])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'bins': edges[:-1],
+                'frequence': hist,
+                'frequence_relative': hist / rows * 100,
+                'frequence_cumulative': np.cumsum(hist) / rows * 100
+            }
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+from src.data_store import concat_frames
+from src.grade_histogram import GradeHistogram
+from src.group_statistics import group_codes
+from src.quantiles import GRID_BINS, grid_bins, histogram_median
+
+# Grain le plus fin du cube : toutes les combinaisons observées de ces dimensions
+CUBE_DIMENSIONS = ['Departement', 'Filière', 'Annee_etude', 'Nom_UE', 'Matiere', 'Session']
+
+# Histogramme de Note_Finale : une case par valeur possible, de 0 à 20 par pas de 0.1
+HISTOGRAM_BINS = GRID_BINS
+
+# Mesures additives de chaque cellule
+SUM_MEASURES = ['Nombre_notes', 'Somme_notes', 'Nombre_reussites', 'Somme_devoir', 'Somme_examen']
+# Somme des carrés des écarts à la moyenne de la cellule (M2) : fusionnée par la formule de Chan
+MEASURE_COLUMNS = SUM_MEASURES + ['M2_notes', 'Note_min', 'Note_max']
+
+
+def pooled_m2(counts, sums, m2, codes, n_groups):
+    """M2 de groupes de cellules : somme des M2 + somme des n_i (moyenne_i - moyenne du groupe)²
+
+    Forme à k parties de la fusion de Chan : aucune différence de grandes sommes de
+    carrés, donc pas d'annulation catastrophique pour des notes très regroupées.
+    """
+    group_counts = np.bincount(codes, weights=counts, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        group_means = np.bincount(codes, weights=sums, minlength=n_groups) / group_counts
+        cell_means = np.where(counts > 0, sums / counts, 0.0)
+    spread = np.where(counts > 0, counts * (cell_means - group_means[codes]) ** 2, 0.0)
+    return np.bincount(codes, weights=m2, minlength=n_groups) + np.bincount(codes, weights=spread, minlength=n_groups)
+
+
+class GradeCube:
+    """Cube OLAP matérialisé des notes finales
+
+    Chaque cellule (combinaison de CUBE_DIMENSIONS) porte des agrégats fusionnables :
+    effectif, somme, somme des carrés des écarts à la moyenne (M2), réussites, min, max, sommes des notes de devoir
+    et d'examen, et l'histogramme des notes au pas de 0.1. Toute combinaison de filtres
+    et de regroupement sur ces dimensions se calcule à partir des cellules (quelques
+    centaines) au lieu des lignes de notes.
+    """
+
+    def __init__(self, cells, histograms, bin_values, exact=True):
+        self.cells = cells                # dimensions + mesures, une ligne par cellule
+        self.dimensions = [col for col in cells.columns if col not in MEASURE_COLUMNS]
+        self.histograms = histograms      # effectifs par cellule et par case (cellules x 201)
+        self.bin_values = bin_values      # valeur exacte de chaque case
+        self.exact = exact                # False si des notes sortent de la grille 0.1 (médianes approchées)
+
+    @classmethod
+    def from_frame(cls, df, dimensions=None):
+        """Construit le cube à partir du DataFrame nettoyé (dimensions : CUBE_DIMENSIONS par défaut)"""
+        dimensions = [col for col in (dimensions or CUBE_DIMENSIONS) if col in df.columns]
+        notes = df['Note_Finale'].to_numpy(dtype='float64')
+
+        # Case de l'histogramme de chaque note ; les notes de la grille 0.1 y sont exactes
+        bins, bin_values, _, exact = grid_bins(notes)
+
+        grouped = df.assign(
+            _note=notes,
+            _reussite=df['Reussite_Bool'].astype('int64'),
+            _devoir=df['Note_Devoir'].astype('float64'),
+            _examen=df['Note_Examen'].astype('float64')
+        ).groupby(dimensions, observed=True)
+        cells = grouped.agg(
+            Nombre_notes=('_note', 'count'),
+            Somme_notes=('_note', 'sum'),
+            Nombre_reussites=('_reussite', 'sum'),
+            Somme_devoir=('_devoir', 'sum'),
+            Somme_examen=('_examen', 'sum'),
+            Note_min=('_note', 'min'),
+            Note_max=('_note', 'max')
+        ).reset_index()
+
+        # ngroup numérote les cellules dans le même ordre que agg
+        cell_codes = grouped.ngroup().to_numpy()
+        valid = (cell_codes >= 0) & ~np.isnan(notes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cell_means = cells['Somme_notes'].to_numpy() / cells['Nombre_notes'].to_numpy()
+        cells['M2_notes'] = np.bincount(cell_codes[valid], weights=(notes[valid] - cell_means[cell_codes[valid]]) ** 2,
+                                        minlength=len(cells))
+        histograms = np.bincount(
+            cell_codes[valid] * HISTOGRAM_BINS + bins[valid],
+            minlength=len(cells) * HISTOGRAM_BINS
+        ).reshape(len(cells), HISTOGRAM_BINS)
+
+        return cls(cells, histograms, bin_values, exact)
+
+    def merge(self, other):
+        """Fusionne deux cubes (par ex. données existantes + ajout d'une session)"""
+        combined = concat_frames([self.cells, other.cells], ignore_index=True)
+        grouped = combined.groupby(self.dimensions, observed=True)
+        aggregations = {col: (col, 'sum') for col in SUM_MEASURES}
+        aggregations.update(Note_min=('Note_min', 'min'), Note_max=('Note_max', 'max'))
+        cells = grouped.agg(**aggregations).reset_index()
+        codes = grouped.ngroup().to_numpy()
+        cells['M2_notes'] = pooled_m2(combined['Nombre_notes'].to_numpy(dtype='float64'),
+                                      combined['Somme_notes'].to_numpy(dtype='float64'),
+                                      combined['M2_notes'].to_numpy(dtype='float64'), codes, len(cells))
+
+        histograms = np.zeros((len(cells), HISTOGRAM_BINS), dtype=np.int64)
+        np.add.at(histograms, codes,
+                  np.concatenate([self.histograms, other.histograms]))
+
+        # Une même case doit désigner la même valeur dans les deux cubes pour rester exacte
+        seen = (self.histograms.sum(axis=0) > 0) & (other.histograms.sum(axis=0) > 0)
+        exact = (self.exact and other.exact
+                 and np.array_equal(self.bin_values[seen], other.bin_values[seen]))
+        bin_values = np.where(self.histograms.sum(axis=0) > 0, self.bin_values, other.bin_values)
+        return GradeCube(cells, histograms, bin_values, exact)
+
+    def _select(self, filters):
+        """Masque des cellules retenues par les filtres {colonne: valeurs}"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for col, values in (filters or {}).items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            mask &= self.cells[col].isin(values).to_numpy()
+        return mask
+
+    def histogram(self, filters=None, group_columns=None):
+        """GradeHistogram des notes retenues par les filtres, somme des histogrammes des cellules"""
+        mask = self._select(filters)
+        return GradeHistogram.from_cells(self.cells[mask], self.histograms[mask], self.bin_values,
+                                         self.exact, group_columns)
+
+    def query(self, filters=None, group_by=None, threshold=None):
+        """Statistiques par groupe pour une combinaison de filtres, calculées sur les cellules
+
+        Retourne une ligne par groupe observé (une seule ligne sans group_by) avec
+        Moyenne_Finale, Mediane, Ecart_type, Count, Min, Max, Variance, Nombre_reussites,
+        Taux_reussite (%), Moyenne_Devoir et Moyenne_Examen. Avec `threshold`, la
+        réussite est recomptée sur l'histogramme pour ce seuil au lieu de Reussite_Bool.
+        """
+        mask = self._select(filters)
+        cells = self.cells[mask]
+        histograms = self.histograms[mask]
+
+        if group_by is None:
+            codes = np.zeros(len(cells), dtype=np.int64)
+            labels = None
+            n_groups = 1
+        else:
+            codes, labels = group_codes(cells[group_by])
+            n_groups = len(labels)
+
+        def total(column):
+            return np.bincount(codes, weights=cells[column].to_numpy(dtype='float64'), minlength=n_groups)
+
+        group_histograms = np.zeros((n_groups, HISTOGRAM_BINS), dtype=np.int64)
+        np.add.at(group_histograms, codes, histograms)
+        minimum = np.full(n_groups, np.inf)
+        np.minimum.at(minimum, codes, cells['Note_min'].to_numpy(dtype='float64'))
+        maximum = np.full(n_groups, -np.inf)
+        np.maximum.at(maximum, codes, cells['Note_max'].to_numpy(dtype='float64'))
+
+        counts = group_histograms.sum(axis=1)
+        if threshold is None:
+            passed = total('Nombre_reussites')
+        else:
+            passed = group_histograms[:, self.bin_values >= threshold].sum(axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = counts.astype('float64')
+            mean = total('Somme_notes') / n
+            m2 = pooled_m2(cells['Nombre_notes'].to_numpy(dtype='float64'),
+                           cells['Somme_notes'].to_numpy(dtype='float64'),
+                           cells['M2_notes'].to_numpy(dtype='float64'), codes, n_groups)
+            variance = np.where(n > 1, m2 / (n - 1), np.nan)
+            variance = np.clip(variance, 0, None)
+            result = pd.DataFrame({
+                'Moyenne_Finale': mean,
+                'Mediane': histogram_median(group_histograms, self.bin_values),
+                'Ecart_type': np.sqrt(variance),
+                'Count': counts,
+                'Min': np.where(counts > 0, minimum, np.nan),
+                'Max': np.where(counts > 0, maximum, np.nan),
+                'Variance': variance,
+                'Nombre_reussites': passed.astype(np.int64),
+                'Taux_reussite': passed / n * 100,
+                'Moyenne_Devoir': total('Somme_devoir') / n,
+                'Moyenne_Examen': total('Somme_examen') / n
+            })
+
+        if labels is None:
+            return result
+        result.index = pd.Index(labels, name=group_by)
+        return result[counts > 0]
@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.accumulators import BASIC_STATISTICS_GROUPS, BasicStatisticsAccumulator
+from src.data_analyzer import DataAnalyzer
+from src.group_statistics import group_codes
+from src.olap_cube import CUBE_DIMENSIONS, GradeCube
+from src.ranking import INFO_COLUMNS, StudentRanking
+
+# Colonnes partagées avec les processus (celles des agrégats partiels)
+PARALLEL_COLUMNS = list(dict.fromkeys(
+    ['ID_Etudiant', 'Note_Finale', 'Note_Devoir', 'Note_Examen', 'Reussite_Bool']
+    + CUBE_DIMENSIONS + list(BASIC_STATISTICS_GROUPS.values()) + INFO_COLUMNS
+))
+
+# Dimensions des cubes partiels : celles de compare_groups et calculate_success_rate
+PARALLEL_DIMENSIONS = list(dict.fromkeys(CUBE_DIMENSIONS + ['Enseignant']))
+
+# Colonnes de répartition : un hachage de l'identifiant (n_workers parties, par défaut),
+# ou un département par partie (autant de parties que de départements, quel que soit n_workers)
+SHARD_COLUMNS = ['ID_Etudiant', 'Departement']
+
+# Blocs de mémoire partagée attachés par chaque processus (rempli par _attach)
+_SHARED = {}
+
+
+def _shard_ids(series, shard_by, n_shards):
+    """Partie de chaque ligne : code de la valeur, ou hachage de l'identifiant modulo n_shards"""
+    codes, labels = group_codes(series)
+    codes = np.asarray(codes, dtype=np.int64)
+    if shard_by == 'ID_Etudiant':
+        # Un étudiant est toujours dans la même partie : ses moyennes se calculent sans échange
+        hashes = pd.util.hash_array(np.asarray(labels, dtype=object)) % np.uint64(n_shards)
+        return np.where(codes >= 0, hashes.astype(np.int64)[codes], 0), n_shards
+    return np.where(codes >= 0, codes, len(labels)), len(labels) + 1
+
+
+def _column_buffer(series):
+    """Tableau numpy de la colonne (codes pour les catégories) et ses libellés"""
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(), None
+    codes, labels = group_codes(series)
+    return np.asarray(codes), labels
+
+
+def _frame(columns):
+    """DataFrame d'une partie à partir des tableaux (codes + libellés pour les catégories)"""
+    data = {}
+    for col, (values, labels) in columns.items():
+        data[col] = values if labels is None else pd.Categorical.from_codes(values, labels)
+    return pd.DataFrame(data, copy=False)
+
+
+def _partials(df):
+    """Agrégats partiels fusionnables d'une partie des données"""
+    return (BasicStatisticsAccumulator().update(df),
+            GradeCube.from_frame(df, dimensions=PARALLEL_DIMENSIONS),
+            StudentRanking(df))
+
+
+def _attach(layout):
+    """Initialisation d'un processus : attache une fois les colonnes en mémoire partagée"""
+    for col, (name, dtype, length, labels) in layout.items():
+        block = shared_memory.SharedMemory(name=name)
+        _SHARED[col] = (block, np.ndarray(length, dtype=dtype, buffer=block.buf), labels)
+
+
+def _shard_partials(start, stop):
+    """Agrégats d'une tranche de lignes, lue sans copie dans la mémoire partagée"""
+    return _partials(_frame({col: (values[start:stop], labels)
+                             for col, (_, values, labels) in _SHARED.items()}))
+
+
+class ParallelAnalyzer:
+    """Exécution répartie de DataAnalyzer sur un pool de processus
+
+    Les lignes sont réparties par hachage de ID_Etudiant (une partie par processus)
+    ou par Departement (une partie par département) ; les
+    colonnes utiles sont copiées une fois en mémoire partagée, triées par partie, et
+    chaque processus lit sa tranche sans copie (catégories transmises en codes). Chaque
+    partie produit des agrégats fusionnables (accumulateurs de statistiques, cube,
+    classement) qui sont ensuite fusionnés : calculate_basic_statistics, compare_groups,
+    calculate_success_rate et get_student_ranking se lisent sur le résultat fusionné.
+    """
+
+    def __init__(self, dataframe, n_workers=None, shard_by='ID_Etudiant'):
+        if shard_by not in SHARD_COLUMNS:
+            raise ValueError(f"Répartition inconnue : {shard_by} (choix : {', '.join(SHARD_COLUMNS)})")
+        self.df = dataframe
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shard_by = shard_by
+        self._partials = None
+
+    def _shards(self):
+        """Ordre des lignes (triées par partie) et bornes de chaque partie"""
+        shards, n_shards = _shard_ids(self.df[self.shard_by], self.shard_by, self.n_workers)
+        order = np.argsort(shards, kind='stable')
+        bounds = np.searchsorted(shards[order], np.arange(n_shards + 1))
+        return order, [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    def partials(self):
+        """Agrégats fusionnés (statistiques, cube, classement), calculés une seule fois"""
+        if self._partials is None:
+            order, bounds = self._shards()
+            columns = {col: _column_buffer(self.df[col]) for col in PARALLEL_COLUMNS if col in self.df.columns}
+            columns = {col: (values[order], labels) for col, (values, labels) in columns.items()}
+            if self.n_workers == 1 or len(bounds) == 1:
+                results = [_partials(_frame({col: (values[start:stop], labels)
+                                             for col, (values, labels) in columns.items()}))
+                           for start, stop in bounds]
+            else:
+                results = self._run_pool(columns, bounds)
+            statistics, cube, ranking = results[0]
+            for other_statistics, other_cube, other_ranking in results[1:]:
+                statistics.merge(other_statistics)
+                cube = cube.merge(other_cube)
+                ranking.merge(other_ranking)
+            self._partials = (statistics, cube, ranking)
+        return self._partials
+
+    def _run_pool(self, columns, bounds):
+        """Agrégats de chaque partie calculés par le pool, sur des colonnes en mémoire partagée"""
+        blocks = []
+        try:
+            layout = {}
+            for col, (values, labels) in columns.items():
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                layout[col] = (block.name, values.dtype, len(values), labels)
+            with ProcessPoolExecutor(max_workers=min(self.n_workers, len(bounds)),
+                                     initializer=_attach, initargs=(layout,)) as pool:
+                return list(pool.map(_shard_partials, *zip(*bounds)))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def calculate_basic_statistics(self):
+        """Même dictionnaire que DataAnalyzer.calculate_basic_statistics"""
+        return self.partials()[0].statistics()
+
+    def compare_groups(self, group_column='Departement'):
+        """Même tableau que DataAnalyzer.compare_groups (les deux arrondissent les mêmes agrégats float64)"""
+        cube = self.partials()[1]
+        if group_column not in cube.dimensions or not cube.exact:
+            return DataAnalyzer(self.df).compare_groups(group_column)  # colonne hors du cube : calcul direct
+        return DataAnalyzer.comparison_from_cube(cube.query(None, group_column))
+
+    def calculate_success_rate(self, groupby_column=None):
+        """Même résultat que DataAnalyzer.calculate_success_rate"""
+        cube = self.partials()[1]
+        if groupby_column is not None and groupby_column not in cube.dimensions:
+            return DataAnalyzer(self.df).calculate_success_rate(groupby_column)
+        return DataAnalyzer.success_rate_from_cube(cube.query(None, groupby_column), groupby_column)
+
+    def get_student_ranking(self, top_n=50):
+        """Même tableau que DataAnalyzer.get_student_ranking"""
+        return self.partials()[2].top(top_n)
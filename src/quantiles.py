@@ -0,0 +1,150 @@
+import numpy as np
+
+# Notes arrondies au dixième sur 0-20 : 201 valeurs possibles, une case d'histogramme chacune
+GRID_BINS = 201
+
+# Compression par défaut des t-digests (nombre de centroïdes de l'ordre de compression / 2)
+DEFAULT_COMPRESSION = 200
+
+
+def grid_bins(values):
+    """Case de la grille 0.1 de chaque valeur, valeur représentée par chaque case, et exactitude
+
+    L'arrondi au dixième conserve l'ordre des valeurs ; l'histogramme représente donc
+    exactement les données tant que chaque case ne reçoit qu'une seule valeur distincte,
+    ce qui est le cas des notes arrondies au dixième (`exact`).
+    """
+    values = np.asarray(values, dtype='float64')
+    bins = np.clip(np.rint(values * 10), 0, GRID_BINS - 1).astype(np.int64)
+    bin_values = np.arange(GRID_BINS, dtype='float64') / 10
+    bin_values[bins] = values
+    bin_seen = np.zeros(GRID_BINS, dtype=bool)
+    bin_seen[bins] = True
+    exact = bool(np.array_equal(bin_values[bins], values))
+    return bins, bin_values, bin_seen, exact
+
+
+def _lerp(lower, upper, fraction):
+    """Interpolation linéaire écrite comme numpy.quantile (mêmes arrondis)"""
+    diff = upper - lower
+    return np.where(fraction >= 0.5, upper - diff * (1 - fraction), lower + diff * fraction)
+
+
+def _value_at_rank(cumulative, bin_values, ranks):
+    """Valeur de rang `ranks` (0 = plus petite) dans chaque histogramme cumulé"""
+    return bin_values[(cumulative > ranks[:, None]).argmax(axis=1)]
+
+
+def histogram_quantile(histograms, bin_values, q):
+    """Quantile linéaire (comme pandas/numpy) de chaque ligne d'histogrammes, en O(groupes x 201)"""
+    cumulative = histograms.cumsum(axis=1)
+    n = cumulative[:, -1]
+    position = (n - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    value = _lerp(_value_at_rank(cumulative, bin_values, lower),
+                  _value_at_rank(cumulative, bin_values, upper), position - lower)
+    return np.where(n > 0, value, np.nan)
+
+
+def histogram_median(histograms, bin_values):
+    """Médiane de chaque ligne d'histogrammes (moyenne des deux valeurs centrales, comme numpy.median)"""
+    cumulative = histograms.cumsum(axis=1)
+    n = cumulative[:, -1]
+    low = _value_at_rank(cumulative, bin_values, (n - 1) // 2)
+    high = _value_at_rank(cumulative, bin_values, n // 2)
+    return np.where(n > 0, (low + high) / 2, np.nan)
+
+
+def histogram_extremes(histograms, bin_values):
+    """Minimum et maximum de chaque ligne d'histogrammes (première et dernière case non vide)"""
+    occupied = histograms > 0
+    n = histograms.sum(axis=1)
+    first = occupied.argmax(axis=1)
+    last = GRID_BINS - 1 - occupied[:, ::-1].argmax(axis=1)
+    return (np.where(n > 0, bin_values[first], np.nan),
+            np.where(n > 0, bin_values[last], np.nan))
+
+
+class TDigest:
+    """Résumé t-digest à mémoire bornée pour les quantiles de données continues
+
+    Les valeurs sont regroupées en centroïdes (moyenne, poids) dont la taille est
+    limitée par la fonction d'échelle k(q) = compression / (2π) · asin(2q − 1) :
+    un centroïde couvre au plus Δk = 1, soit une fraction 2π·√(q(1 − q)) / compression
+    des valeurs autour du rang q. L'erreur sur le rang d'un quantile est au plus la
+    moitié d'un centroïde : π·√(q(1 − q)) / compression, soit 0.8 % des valeurs à la
+    médiane et 0.7 % aux quartiles pour compression = 200, et elle tend vers 0 aux
+    extrémités (minimum et maximum exacts). La mémoire reste de l'ordre de
+    compression / 2 centroïdes quel que soit le nombre de valeurs ; deux digests se
+    fusionnent en recompressant leurs centroïdes.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _compress(self, means, weights):
+        """Regroupe les centroïdes triés par tranche de l'échelle k"""
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total == 0:
+            self.means, self.weights = means, weights
+            return
+        cumulative = np.cumsum(weights)
+        middle = (cumulative - weights / 2) / total
+        scale = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * middle - 1, -1, 1))
+        slots = np.floor(scale).astype(np.int64)
+        # Les extrémités restent des centroïdes individuels (minimum et maximum exacts)
+        slots[0], slots[-1] = slots.min() - 1, slots.max() + 1
+        starts = np.flatnonzero(np.diff(slots, prepend=slots[0] - 1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values):
+        """Ajoute des valeurs (les NaN sont ignorées)"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        return self.update_weighted(values, np.ones(len(values)))
+
+    def update_weighted(self, values, weights):
+        """Ajoute des valeurs pondérées, par ex. les cases non vides d'un histogramme"""
+        values = np.asarray(values, dtype='float64')
+        weights = np.asarray(weights, dtype='float64')
+        keep = weights > 0
+        if not keep.any():
+            return self
+        values, weights = values[keep], weights[keep]
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre digest dans celui-ci"""
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress(np.concatenate([self.means, other.means]),
+                       np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        """Quantile approché, interpolé entre les centres des centroïdes (rang (n − 1)·q, comme pandas)"""
+        n = self.count
+        if n == 0:
+            return np.nan
+        if n == 1:
+            return self.means[0]
+        # Rang de chaque centre de centroïde ; minimum et maximum aux rangs 0 et n − 1
+        centers = np.cumsum(self.weights) - (self.weights + 1) / 2
+        ranks = np.concatenate([[0.0], centers, [n - 1]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return float(np.interp((n - 1) * q, ranks, values))
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+from src.result_cache import filter_signature
+
+# Fonctions d'agrégation acceptées par Query.agg
+AGGREGATIONS = ['mean', 'median', 'std', 'var', 'min', 'max', 'count', 'sum', 'pass_rate']
+
+# Seuil de pass_rate pour une colonne de notes (une colonne booléenne est lue telle quelle)
+PASS_MARK = 10.0
+
+# Colonnes de réussite : Reussite et Reussite_Bool valent toutes deux Note_Finale >= 10
+SUCCESS_COLUMNS = ['Reussite', 'Reussite_Bool']
+
+# Agrégats lus dans GradeCube.query : (colonne, fonction) -> colonne du résultat
+CUBE_MEASURES = {
+    ('Note_Finale', 'mean'): 'Moyenne_Finale',
+    ('Note_Finale', 'median'): 'Mediane',
+    ('Note_Finale', 'std'): 'Ecart_type',
+    ('Note_Finale', 'var'): 'Variance',
+    ('Note_Finale', 'min'): 'Min',
+    ('Note_Finale', 'max'): 'Max',
+    ('Note_Finale', 'count'): 'Count',
+    ('Note_Finale', 'pass_rate'): 'Taux_reussite',
+    ('Note_Devoir', 'mean'): 'Moyenne_Devoir',
+    ('Note_Examen', 'mean'): 'Moyenne_Examen',
+}
+CUBE_MEASURES.update({(col, 'pass_rate'): 'Taux_reussite' for col in SUCCESS_COLUMNS})
+CUBE_MEASURES.update({(col, 'sum'): 'Nombre_reussites' for col in SUCCESS_COLUMNS})
+
+
+def _values(values):
+    """Valeurs d'un filtre sous forme de liste"""
+    return list(values) if isinstance(values, (list, tuple, set, pd.Index, np.ndarray)) else [values]
+
+
+def _scalar(value):
+    """Valeur Python d'un agrégat sans regroupement (int ou float plutôt que np.int64 / np.float64)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def combine_filters(*filters):
+    """Intersection de plusieurs filtres {colonne: valeurs}"""
+    combined = {}
+    for current in filters:
+        for col, values in (current or {}).items():
+            values = _values(values)
+            combined[col] = [value for value in combined[col] if value in values] if col in combined else values
+    return combined
+
+
+class Query:
+    """Requête paresseuse : filtres, colonnes, regroupement et agrégats, exécutés une seule fois
+
+    where / select / group_by / agg ne font que construire un plan (chaque appel
+    retourne une nouvelle requête). collect choisit la source la moins coûteuse :
+    - 'cube' : regroupement et filtres sur les dimensions du cube, agrégats qu'il porte ;
+    - 'loader' : lecture des seules colonnes utiles, filtres appliqués à la lecture
+      (Parquet du cache, partitions) quand la requête part d'un DataLoader ;
+    - 'dataframe' : colonnes utiles des données de l'analyseur, puis filtre et groupby.
+    Avec un analyseur, le résultat est mémorisé dans son cache (même plan, mêmes données).
+    """
+
+    def __init__(self, analyzer=None, loader=None):
+        if analyzer is None and loader is None:
+            raise ValueError("Une requête porte sur un DataAnalyzer ou un DataLoader")
+        self.analyzer = analyzer
+        self.loader = loader
+        self.filters = {}
+        self.columns = None
+        self.groups = []
+        self.aggregations = {}
+
+    def _copy(self, **changes):
+        query = Query(self.analyzer, self.loader)
+        query.__dict__.update({**self.__dict__, **changes})
+        return query
+
+    def where(self, filters=None, **conditions):
+        """Ajoute des filtres {colonne: valeur ou liste de valeurs} (cumulés par intersection)"""
+        return self._copy(filters=combine_filters(self.filters, filters, conditions))
+
+    def select(self, *columns):
+        """Colonnes du résultat (requête sans agrégat)"""
+        return self._copy(columns=list(columns))
+
+    def group_by(self, *columns):
+        """Colonnes de regroupement"""
+        return self._copy(groups=list(columns))
+
+    def agg(self, **aggregations):
+        """Agrégats nommés : nom=colonne (le nom est la fonction) ou nom=(colonne, fonction)"""
+        parsed = dict(self.aggregations)
+        for name, spec in aggregations.items():
+            column, function = spec if isinstance(spec, tuple) else (spec, name)
+            if function not in AGGREGATIONS:
+                raise ValueError(f"Agrégation inconnue : {function} (choix : {', '.join(AGGREGATIONS)})")
+            parsed[name] = (column, function)
+        return self._copy(aggregations=parsed)
+
+    def needed_columns(self):
+        """Colonnes à lire : filtres, regroupement, agrégats ou sélection"""
+        if self.aggregations:
+            columns = [column for column, _ in self.aggregations.values()]
+        else:
+            columns = self.columns or []
+        return list(dict.fromkeys(list(self.filters) + self.groups + columns))
+
+    def _cube(self):
+        """Cube de l'analyseur si toute la requête s'y calcule, sinon None"""
+        if self.analyzer is None or not self.aggregations or len(self.groups) > 1:
+            return None
+        cube = self.analyzer.cube_for(self.groups[0] if self.groups else None)
+        if cube is None or any(col not in cube.dimensions for col in self.filters):
+            return None
+        if any(spec not in CUBE_MEASURES for spec in self.aggregations.values()):
+            return None
+        return cube
+
+    def source(self):
+        """Source choisie pour l'exécution : 'cube', 'loader' ou 'dataframe'"""
+        if self._cube() is not None:
+            return 'cube'
+        return 'dataframe' if self.analyzer is not None else 'loader'
+
+    def plan(self):
+        """Plan d'exécution (dictionnaire)"""
+        source = self.source()
+        filters = self.filters
+        if source == 'cube':
+            filters = combine_filters(self.analyzer.filters, self.filters)
+        return {
+            'source': source,
+            'filtres': filters,
+            'colonnes': None if self.columns is None and not self.aggregations else self.needed_columns(),
+            'regroupement': list(self.groups),
+            'agregats': dict(self.aggregations)
+        }
+
+    def explain(self):
+        """Description lisible du plan d'exécution"""
+        plan = self.plan()
+        lines = [f"Source : {plan['source']}"]
+        if plan['filtres']:
+            lines.append("Filtres : " + ", ".join(f"{col} ∈ {values}" for col, values in plan['filtres'].items()))
+        lines.append("Colonnes lues : " + (", ".join(plan['colonnes']) if plan['colonnes'] else "toutes"))
+        if plan['regroupement']:
+            lines.append("Regroupement : " + ", ".join(plan['regroupement']))
+        for name, (column, function) in plan['agregats'].items():
+            lines.append(f"Agrégat : {name} = {function}({column})")
+        return "\n".join(lines)
+
+    def collect(self):
+        """Exécute la requête : DataFrame (un agrégat par colonne) ou dictionnaire sans regroupement"""
+        if self.analyzer is None:
+            return self._execute()
+        key = (filter_signature(self.filters), tuple(self.columns or ()), tuple(self.groups),
+               tuple(sorted(self.aggregations.items())))
+        return self.analyzer._cached('query', self._execute, key)
+
+    def _execute(self):
+        cube = self._cube()
+        if cube is not None:
+            return self._from_cube(cube)
+        keys = None
+        if self.analyzer is None:
+            df = self.loader.load_columns(columns=self.needed_columns(), filters=self.filters)
+        else:
+            df = self.analyzer.df
+            if self.columns is not None or self.aggregations:
+                df = df[self.needed_columns()]  # projection avant le filtre : moins de colonnes copiées
+            if self.aggregations and len(self.groups) == 1:
+                keys = self.analyzer._group_key(self.groups[0])  # codes entiers (schéma en étoile s'il existe)
+            if self.filters:
+                mask = np.ones(len(df), dtype=bool)
+                for col, values in self.filters.items():
+                    mask &= df[col].isin(values).to_numpy()
+                df = df[mask]
+                keys = keys[mask] if keys is not None else None
+        if self.aggregations:
+            return self._aggregate(df, keys)
+        return df if self.columns is None else df[self.columns]
+
+    def _from_cube(self, cube):
+        filters = combine_filters(self.analyzer.filters, self.filters)
+        group = self.groups[0] if self.groups else None
+        results = cube.query(filters, group)
+        if group is None and not len(results):
+            return {name: np.nan for name in self.aggregations}
+        frame = pd.DataFrame({name: results[CUBE_MEASURES[spec]] for name, spec in self.aggregations.items()})
+        if group:
+            return frame
+        return {name: _scalar(frame[name].iloc[0]) for name in frame.columns}  # iloc[0] sur la ligne convertirait les effectifs en float
+
+    def _aggregate(self, df, keys=None):
+        """Agrégats sur les lignes (pass_rate : moyenne d'une colonne de réussite en %)
+
+        Les notes float32 sont agrégées en float64, comme dans le cube : une requête
+        donne les mêmes valeurs quelle que soit la source choisie. keys : clé de
+        regroupement déjà calculée (sinon les colonnes de group_by).
+        """
+        columns = {}
+        named = {}
+        for name, (column, function) in self.aggregations.items():
+            if function == 'pass_rate':
+                passed = df[column] if pd.api.types.is_bool_dtype(df[column]) else df[column] >= PASS_MARK
+                columns[f"_{name}"] = passed.to_numpy(dtype='float64') * 100
+                named[name] = (f"_{name}", 'mean')
+            else:
+                if df[column].dtype == np.float32:
+                    columns[column] = df[column].astype('float64')
+                named[name] = (column, function)
+        df = df.assign(**columns)
+        if not self.groups:
+            return {name: _scalar(df[column].agg(function)) for name, (column, function) in named.items()}
+        return df.groupby(keys if keys is not None else self.groups, observed=True).agg(**named)
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from src.group_statistics import group_codes
+
+# Informations de l'étudiant reprises de sa première ligne (colonnes de get_student_ranking)
+STUDENT_COLUMNS = ['Nom', 'Prenom', 'Departement', 'Filière']
+
+# Regroupements dans lesquels les étudiants sont aussi classés
+RANKING_GROUPS = ['Departement', 'Filière', 'Annee_etude']
+
+# Colonnes conservées pour chaque étudiant
+INFO_COLUMNS = STUDENT_COLUMNS + [col for col in RANKING_GROUPS if col not in STUDENT_COLUMNS]
+
+
+def rank_within(values, groups=None):
+    """Rangs (ordre décroissant) de chaque valeur dans son groupe, en une passe vectorisée
+
+    Retourne (rang compétition, rang dense, percentile) : le rang compétition vaut
+    1 + le nombre de valeurs strictement supérieures du groupe (1, 2, 2, 4), le rang
+    dense numérote les valeurs distinctes (1, 2, 2, 3) et le percentile est la part du
+    groupe ayant une valeur inférieure ou égale (en %). Les NaN sont classés derniers.
+    """
+    n = len(values)
+    groups = np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+    keys = np.where(np.isnan(values), -np.inf, values)
+    # Groupes contigus, valeurs décroissantes à l'intérieur de chaque groupe
+    order = np.lexsort((-keys, groups))
+    sorted_groups, sorted_keys = groups[order], keys[order]
+    positions = np.arange(n)
+
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    new_value = new_group.copy()
+    new_value[1:] |= sorted_keys[1:] != sorted_keys[:-1]
+
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0))
+    value_start = np.maximum.accumulate(np.where(new_value, positions, 0))
+    distinct = np.cumsum(new_value)
+    segment = np.cumsum(new_group) - 1
+    group_size = np.bincount(segment)[segment]
+
+    competition = np.empty(n, dtype=np.int64)
+    dense = np.empty(n, dtype=np.int64)
+    percentile = np.empty(n, dtype='float64')
+    competition[order] = value_start - group_start + 1
+    dense[order] = distinct - distinct[group_start] + 1
+    percentile[order] = (group_size - (value_start - group_start)) / group_size * 100
+    return competition, dense, percentile
+
+
+class StudentRanking:
+    """Classement des étudiants par moyenne générale, à partir d'agrégats compacts
+
+    Chaque étudiant est un indice dans des tableaux numpy (somme et nombre de notes,
+    codes de ses informations). Le top-k se fait par sélection partielle
+    (np.argpartition) ; les rangs et percentiles, globaux et par Departement, Filière
+    et Annee_etude, sont calculés en une passe. À l'arrivée de nouvelles notes, seuls
+    les étudiants concernés sont mis à jour et la liste triée des moyennes est corrigée
+    par insertion, sans nouveau tri complet. À moyenne égale, l'ordre suit l'identifiant.
+    """
+
+    def __init__(self, df):
+        self.labels = pd.Index([], name='ID_Etudiant')
+        self.sums = np.zeros(0)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.info = pd.DataFrame(columns=INFO_COLUMNS)
+        self.dtype = df['Note_Finale'].dtype
+        self._sorted = np.zeros(0)   # moyennes de tous les étudiants, triées par ordre croissant
+        self._ranks = None
+        self.update(df)
+
+    @property
+    def averages(self):
+        """Moyenne générale de chaque étudiant (dans le type de Note_Finale)"""
+        # Sommes en float64 : moyenne correctement arrondie dans le type des notes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.sums / self.counts).astype(self.dtype).astype('float64')
+
+    def update(self, df):
+        """Intègre de nouvelles notes (nouveaux étudiants ou notes supplémentaires)"""
+        codes, labels = group_codes(df['ID_Etudiant'])
+        codes = np.asarray(codes, dtype=np.int64)
+        notes = df['Note_Finale'].to_numpy(dtype='float64')
+        valid = (codes >= 0) & ~np.isnan(notes)
+        sums = np.bincount(codes[valid], weights=notes[valid], minlength=len(labels))
+        counts = np.bincount(codes[valid], minlength=len(labels))
+
+        # Étudiants du bloc : informations prises de leur première ligne
+        rows = np.flatnonzero(codes >= 0)
+        first_rows = rows[np.unique(codes[rows], return_index=True)[1]]
+        present = codes[first_rows]
+        info = df.iloc[first_rows][[col for col in self.info.columns if col in df.columns]]
+        return self._add(pd.Index(labels)[present], sums[present], counts[present], info)
+
+    def merge(self, other):
+        """Fusionne le classement d'une autre partie des données (autre bloc, autre processus)"""
+        return self._add(other.labels, other.sums, other.counts, other.info)
+
+    def _add(self, labels, sums, counts, info):
+        """Ajoute des sommes et nombres de notes par étudiant (info : une ligne par étudiant)"""
+        new = ~labels.isin(self.labels)
+        if new.any():
+            added = info[new].copy()
+            added.index = labels[new]
+            self.info = added if len(self.labels) == 0 else pd.concat([self.info, added])
+            self.labels = self.labels.append(labels[new]).rename('ID_Etudiant')
+            self.sums = np.concatenate([self.sums, np.zeros(new.sum())])
+            self.counts = np.concatenate([self.counts, np.zeros(new.sum(), dtype=np.int64)])
+
+        # Les libellés sont uniques : une seule position par étudiant
+        positions = self.labels.get_indexer(labels)
+        touched = positions[counts > 0]
+        before = self.averages[touched]
+        self.sums[positions] += sums
+        self.counts[positions] += counts
+        after = self.averages[touched]
+
+        # Moyennes triées : retrait des anciennes valeurs (étudiants déjà notés), insertion des nouvelles
+        self._sorted = self._remove_sorted(self._sorted, before[~np.isnan(before)])
+        additions = np.sort(after[~np.isnan(after)])
+        self._sorted = np.insert(self._sorted, np.searchsorted(self._sorted, additions), additions)
+        self._ranks = None
+        return self
+
+    @staticmethod
+    def _remove_sorted(sorted_values, values):
+        """Retire une occurrence de chaque valeur d'un tableau trié"""
+        values = np.sort(values)
+        first = np.searchsorted(sorted_values, values, side='left')
+        # Valeurs répétées : occurrences successives
+        offset = np.arange(len(values)) - np.searchsorted(values, values, side='left')
+        return np.delete(sorted_values, first + offset)
+
+    def top(self, k=50):
+        """k meilleurs étudiants (mêmes colonnes que DataAnalyzer.get_student_ranking)"""
+        averages = self.averages
+        keys = np.where(np.isnan(averages), np.inf, -averages)
+        n = len(keys)
+        if k < n:
+            # Sélection partielle, puis tous les ex aequo de la k-ième moyenne
+            threshold = keys[np.argpartition(keys, k - 1)[k - 1]] if k > 0 else -np.inf
+            candidates = np.flatnonzero(keys <= threshold)
+        else:
+            candidates = np.arange(n)
+        # Identifiants croissants, puis moyennes décroissantes (tri stable : l'identifiant départage)
+        candidates = candidates[self.labels[candidates].argsort()]
+        selected = candidates[np.argsort(keys[candidates], kind='stable')][:k]
+        return self._frame(selected, averages)
+
+    def _frame(self, selected, averages):
+        result = self.info.iloc[selected][STUDENT_COLUMNS].copy()
+        result.index = self.labels[selected]
+        result['Moyenne_Generale'] = averages[selected].astype(self.dtype)
+        result['Nombre_notes'] = self.counts[selected]
+        return result
+
+    def rank_of(self, student_ids):
+        """Rang compétition global et percentile d'étudiants, lus dans la liste triée des moyennes
+
+        Un identifiant inconnu a un rang et un percentile NaN.
+        """
+        positions = self.labels.get_indexer(pd.Index(student_ids))
+        known = positions >= 0
+        n = len(self._sorted)
+        at_most = np.searchsorted(self._sorted, self.averages[positions[known]], side='right')
+        rank = np.full(len(positions), np.nan)
+        percentile = np.full(len(positions), np.nan)
+        rank[known] = n - at_most + 1
+        percentile[known] = at_most / n * 100
+        return pd.DataFrame({
+            'Rang': rank if not known.all() else rank.astype(np.int64),
+            'Percentile': percentile
+        }, index=pd.Index(student_ids, name='ID_Etudiant'))
+
+    def ranks(self):
+        """Rangs compétition et denses et percentiles, globaux et par regroupement"""
+        if self._ranks is None:
+            averages = self.averages
+            columns = {'Moyenne_Generale': averages.astype(self.dtype),
+                       'Nombre_notes': self.counts}
+            scopes = [('', None)] + [(f"_{col}", group_codes(self.info[col])[0])
+                                     for col in RANKING_GROUPS if col in self.info.columns]
+            for suffix, groups in scopes:
+                competition, dense, percentile = rank_within(averages, groups)
+                columns[f"Rang{suffix}"] = competition
+                columns[f"Rang_dense{suffix}"] = dense
+                columns[f"Percentile{suffix}"] = percentile
+            self._ranks = pd.DataFrame(columns, index=self.labels)
+        return self._ranks.copy()
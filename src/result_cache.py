@@ -0,0 +1,116 @@
+import copy
+import hashlib
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Bornes par défaut du cache de résultats de DataAnalyzer
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Valeur retournée par ResultCache.get pour une clé absente
+MISSING = object()
+
+
+def dataset_fingerprint(df):
+    """Empreinte du contenu d'un DataFrame (valeurs, index et colonnes)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def filter_signature(filters):
+    """Forme canonique de filtres {colonne: valeurs} : ordre des colonnes et des valeurs indifférent"""
+    return tuple(sorted(
+        (col, tuple(sorted({str(value) for value in values})))
+        for col, values in (filters or {}).items()
+    ))
+
+
+def approximate_size(value):
+    """Taille mémoire approximative d'un résultat (octets)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approximate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Cache LRU de résultats, borné en nombre d'entrées et en taille mémoire approximative
+
+    L'entrée la moins récemment utilisée est évincée dès qu'une des deux bornes est
+    dépassée ; un résultat plus gros que max_bytes n'est pas conservé. Les résultats
+    sont copiés à l'entrée et à la sortie, l'appelant peut donc les modifier.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clé -> (résultat, taille)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Résultat associé à la clé (MISSING si absent)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry[0])
+
+    def put(self, key, value):
+        """Conserve un résultat puis évince les plus anciens au-delà des bornes"""
+        size = approximate_size(value)
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (copy.deepcopy(value), size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Résultat en cache, ou calculé par compute() puis mis en cache"""
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """Compteurs du cache : succès, échecs, taux de succès, entrées, octets, évictions"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups * 100 if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.group_statistics import group_codes
+
+# Regroupements testés par défaut (ceux de compare_groups dans le dashboard)
+SIGNIFICANCE_GROUPS = ['Departement', 'Filière', 'Nom_UE', 'Matiere', 'Enseignant']
+
+# Seuil de significativité par défaut
+DEFAULT_ALPHA = 0.05
+
+
+def holm_correction(p_values):
+    """p-values ajustées par la méthode de Holm (les NaN sont ignorés)"""
+    p_values = np.asarray(p_values, dtype='float64')
+    adjusted = np.full(len(p_values), np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    order = valid[np.argsort(p_values[valid], kind='stable')]
+    m = len(order)
+    steps = (m - np.arange(m)) * p_values[order]
+    adjusted[order] = np.minimum(np.maximum.accumulate(steps), 1.0)
+    return adjusted
+
+
+class SignificanceTests:
+    """Tests de différences entre groupes pour plusieurs regroupements, sur une seule disposition des notes
+
+    Les notes sont lues une fois, leurs rangs (Kruskal–Wallis) et la correction des
+    ex aequo sont calculés une fois pour toutes : ils ne dépendent pas du regroupement.
+    Pour chaque colonne, effectifs, sommes, sommes des carrés, sommes des rangs et
+    réussites par groupe s'obtiennent par np.bincount sur ses codes ; ANOVA,
+    Kruskal–Wallis, khi-deux des taux de réussite et tests de Welch de toutes les paires
+    (p-values corrigées par Holm) se calculent ensuite sur ces agrégats.
+    """
+
+    def __init__(self, df, group_columns=None):
+        notes = df['Note_Finale'].to_numpy(dtype='float64')
+        self.valid = ~np.isnan(notes)
+        self.notes = notes[self.valid]
+        # Notes centrées : sommes des carrés sans perte de précision
+        self.centered = self.notes - self.notes.mean() if len(self.notes) else self.notes
+        self.ranks, self.tie_correction = self._ranking(self.notes)
+        if 'Reussite_Bool' in df.columns:
+            self.passed = df['Reussite_Bool'].to_numpy(dtype='float64')[self.valid]
+        else:
+            self.passed = (self.notes >= 10).astype('float64')
+        self.groups = {}
+        for col in (group_columns or SIGNIFICANCE_GROUPS):
+            if col in df.columns:
+                codes, labels = group_codes(df[col])
+                self.groups[col] = (np.asarray(codes, dtype=np.int64)[self.valid], labels)
+
+    @staticmethod
+    def _ranking(notes):
+        """Rangs moyens des notes et facteur de correction des ex aequo de Kruskal–Wallis"""
+        n = len(notes)
+        _, ties = np.unique(notes, return_counts=True)
+        return stats.rankdata(notes), (1 - (ties ** 3 - ties).sum() / (n ** 3 - n) if n > 1 else 1.0)
+
+    def _aggregates(self, codes, n_groups):
+        """Effectif, moyenne, variance (ddof=1), somme des rangs et réussites de chaque groupe observé"""
+        keep = codes >= 0
+        codes = codes[keep]
+        if keep.all():
+            ranks, tie_correction = self.ranks, self.tie_correction
+        else:
+            ranks, tie_correction = self._ranking(self.notes[keep])  # rangs parmi les notes groupées seulement
+        count = np.bincount(codes, minlength=n_groups)
+        observed = count > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(codes, weights=self.centered[keep], minlength=n_groups) / count
+            squares = np.bincount(codes, weights=(self.centered[keep] - mean[codes]) ** 2, minlength=n_groups)
+            variance = squares / (count - 1)
+        rank_sum = np.bincount(codes, weights=ranks, minlength=n_groups)
+        passed = np.bincount(codes, weights=self.passed[keep], minlength=n_groups)
+        return observed, count, mean, squares, variance, rank_sum, passed, tie_correction
+
+    def _global_tests(self, count, mean, squares, rank_sum, passed, tie_correction):
+        """ANOVA à un facteur, Kruskal–Wallis et khi-deux (réussite x groupe, sans correction de Yates)"""
+        n, k = count.sum(), len(count)
+        grand_mean = (count * mean).sum() / n
+        between = (count * (mean - grand_mean) ** 2).sum()
+        within = squares.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_value = (between / (k - 1)) / (within / (n - k))
+            h_value = (12 / (n * (n + 1)) * (rank_sum ** 2 / count).sum() - 3 * (n + 1)) / tie_correction
+            observed = np.column_stack([passed, count - passed])
+            expected = count[:, None] * observed.sum(axis=0)[None, :] / n
+            chi2_value = ((observed - expected) ** 2 / expected).sum()
+        return [
+            ('ANOVA', f_value, f"{k - 1}, {n - k}", stats.f.sf(f_value, k - 1, n - k)),
+            ('Kruskal-Wallis', h_value, f"{k - 1}", stats.chi2.sf(h_value, k - 1)),
+            ('Khi-deux réussite', chi2_value, f"{k - 1}", stats.chi2.sf(chi2_value, k - 1)),
+        ]
+
+    def _pairwise(self, labels, count, mean, variance):
+        """Tests de Welch de toutes les paires de groupes"""
+        first, second = np.triu_indices(len(count), k=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a, b = variance[first] / count[first], variance[second] / count[second]
+            difference = mean[first] - mean[second]
+            t_value = difference / np.sqrt(a + b)
+            dof = (a + b) ** 2 / (a ** 2 / (count[first] - 1) + b ** 2 / (count[second] - 1))
+            p_value = 2 * stats.t.sf(np.abs(t_value), dof)
+        return pd.DataFrame({
+            'Groupe_1': np.asarray(labels)[first],
+            'Groupe_2': np.asarray(labels)[second],
+            'Difference': difference,
+            'Statistique': t_value,
+            'ddl': dof,
+            'p_value': p_value,
+            'p_value_Holm': holm_correction(p_value)
+        })
+
+    def run(self, alpha=DEFAULT_ALPHA):
+        """Dictionnaire de deux tables :
+        - 'tests' : une ligne par (regroupement, test) : statistique, ddl, p-value, significatif ;
+        - 'comparaisons' : une ligne par paire de groupes (Welch, p-value corrigée par Holm).
+        """
+        tests, comparisons = [], []
+        for col, (codes, labels) in self.groups.items():
+            observed, count, mean, squares, variance, rank_sum, passed, tie_correction = \
+                self._aggregates(codes, len(labels))
+            for test, statistic, dof, p_value in self._global_tests(count[observed], mean[observed],
+                                                                   squares[observed], rank_sum[observed],
+                                                                   passed[observed], tie_correction):
+                tests.append({'Regroupement': col, 'Test': test, 'Groupes': int(observed.sum()),
+                              'Statistique': statistic, 'ddl': dof, 'p_value': p_value})
+            pairs = self._pairwise(labels[observed], count[observed], mean[observed], variance[observed])
+            pairs.insert(0, 'Regroupement', col)
+            comparisons.append(pairs)
+
+        tests = pd.DataFrame(tests, columns=['Regroupement', 'Test', 'Groupes', 'Statistique', 'ddl', 'p_value'])
+        tests['Significatif'] = tests['p_value'] < alpha
+        comparisons = pd.concat(comparisons, ignore_index=True) if comparisons else pd.DataFrame(
+            columns=['Regroupement', 'Groupe_1', 'Groupe_2', 'Difference', 'Statistique', 'ddl',
+                     'p_value', 'p_value_Holm'])
+        comparisons['Significatif'] = comparisons['p_value_Holm'] < alpha
+        return {'tests': tests, 'comparaisons': comparisons}
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.group_statistics import group_codes
+
+# Attributs répétés sur chaque ligne, déplacés dans les tables de dimension
+STUDENT_COLUMNS = ['ID_Etudiant', 'Nom', 'Prenom', 'Departement', 'Grade', 'Annee_etude', 'Filière']
+COURSE_COLUMNS = ['Code_Matiere', 'Code_UE', 'Nom_UE', 'Matiere']
+TEACHER_COLUMNS = ['Enseignant']
+EVALUATION_COLUMNS = ['Session', 'Date_Devoir', 'Date_Examen', 'Coefficient_Devoir', 'Coefficient_Examen']
+
+# Clés de la table de faits vers chaque dimension
+STUDENT_KEY = 'Cle_Etudiant'
+COURSE_KEY = 'Cle_Matiere'
+TEACHER_KEY = 'Cle_Enseignant'
+EVALUATION_KEY = 'Cle_Evaluation'
+KEY_COLUMNS = [STUDENT_KEY, COURSE_KEY, TEACHER_KEY, EVALUATION_KEY]
+
+# Mesures conservées dans la table de faits (Reussite telle que chargée, sans la recalculer)
+GRADE_COLUMNS = ['Note_Devoir', 'Note_Examen', 'Note_Finale', 'Reussite']
+
+# Colonnes recalculées à partir de Note_Finale quand une vue les demande et que les faits ne les portent pas
+DERIVED_FACT_COLUMNS = ['Reussite', 'Reussite_Bool', 'Categorie_Note']
+
+
+def _smallest_int(n):
+    """Plus petit type entier signé capable de coder n clés"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _varying_columns(df, columns, key_columns):
+    """Colonnes qui ne dépendent pas fonctionnellement de la clé (plusieurs valeurs pour une même clé)"""
+    others = [col for col in columns if col not in key_columns]
+    if not others or len(df) == 0:
+        return []
+    counts = df.groupby(key_columns, observed=True, sort=False, dropna=False)[others].nunique(dropna=False)
+    return [col for col in others if counts[col].max() > 1]
+
+
+def _dimension(df, columns, key_columns=None):
+    """Table de dimension (une ligne par valeur de la clé), clé de chaque ligne de df et colonnes écartées
+
+    Seules les colonnes qui dépendent fonctionnellement de la clé entrent dans la dimension ;
+    les autres (ex. Annee_etude d'un étudiant inscrit sur plusieurs années) sont renvoyées
+    à part pour rester au niveau de la ligne, dans la table de faits.
+    """
+    key_columns = key_columns or columns
+    varying = _varying_columns(df, columns, key_columns)
+    columns = [col for col in columns if col not in varying]
+    keys = df.groupby(key_columns, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    dimension = df[columns].drop_duplicates(key_columns).reset_index(drop=True)
+    return dimension, keys, varying
+
+
+class StarSchema:
+    """Schéma en étoile : table de faits étroite (clés entières + notes) et dimensions"""
+
+    def __init__(self, facts, students, courses, teachers, evaluations):
+        self.facts = facts
+        self.students = students
+        self.courses = courses
+        self.teachers = teachers
+        self.evaluations = evaluations
+
+    @classmethod
+    def from_frame(cls, df, dictionary_path=None):
+        """Découpe le DataFrame nettoyé en table de faits et tables de dimension
+
+        La dimension des matières part du dictionnaire UE/matière s'il est fourni,
+        complété par les matières présentes dans les données mais absentes du dictionnaire.
+        """
+        # Dimension étudiants : une ligne par ID_Etudiant (les attributs d'inscription qui
+        # changent d'une ligne à l'autre pour un même étudiant restent dans les faits)
+        students, student_keys, student_varying = _dimension(df, STUDENT_COLUMNS, ['ID_Etudiant'])
+
+        # Dimension matières
+        course_varying = _varying_columns(df, COURSE_COLUMNS, ['Code_Matiere'])
+        observed = df[COURSE_COLUMNS].drop_duplicates('Code_Matiere')
+        if dictionary_path is not None and Path(dictionary_path).exists():
+            dictionary = pd.read_csv(dictionary_path, encoding='utf-8')
+            missing = observed[~observed['Code_Matiere'].isin(dictionary['Code_Matiere'])]
+            courses = pd.concat([dictionary, missing], ignore_index=True)
+        else:
+            courses = observed.reset_index(drop=True)
+        courses = courses.drop(columns=[col for col in course_varying if col in courses.columns])
+        for col in courses.columns:
+            if pd.api.types.is_object_dtype(courses[col]) or pd.api.types.is_string_dtype(courses[col]):
+                courses[col] = courses[col].astype('category')
+        course_keys = pd.Index(courses['Code_Matiere'].astype(str)).get_indexer(df['Code_Matiere'].astype(str))
+
+        # Dimensions enseignants et évaluations (session, dates, coefficients)
+        teachers, teacher_keys, _ = _dimension(df, TEACHER_COLUMNS)
+        evaluations, evaluation_keys, _ = _dimension(df, EVALUATION_COLUMNS)
+
+        # Table de faits : clés entières + notes + attributs non dépendants de leur clé
+        # (Reussite_Bool et Categorie_Note ne sont pas copiées, elles se recalculent)
+        facts = pd.DataFrame({
+            STUDENT_KEY: student_keys.astype(_smallest_int(len(students))),
+            COURSE_KEY: course_keys.astype(_smallest_int(len(courses))),
+            TEACHER_KEY: teacher_keys.astype(_smallest_int(len(teachers))),
+            EVALUATION_KEY: evaluation_keys.astype(_smallest_int(len(evaluations)))
+        }, index=df.index)
+        for col in GRADE_COLUMNS + student_varying + course_varying:
+            if col in df.columns:
+                facts[col] = df[col]
+
+        return cls(facts, students, courses, teachers, evaluations)
+
+    def _dimensions(self):
+        """Dimensions avec la clé correspondante dans la table de faits"""
+        return [
+            (self.students, STUDENT_KEY),
+            (self.courses, COURSE_KEY),
+            (self.teachers, TEACHER_KEY),
+            (self.evaluations, EVALUATION_KEY)
+        ]
+
+    def dimension_of(self, column):
+        """Dimension portant la colonne et clé correspondante dans la table de faits (None si absente)
+
+        Une colonne gardée dans les faits (non dépendante de sa clé) n'a pas de dimension.
+        """
+        for dimension, key in self._dimensions():
+            if column in dimension.columns:
+                return dimension, key
+        return None
+
+    def group_codes(self, column, rows=None):
+        """Codes de regroupement d'un attribut de dimension pour les faits (ou les positions rows)
+
+        Les libellés sont factorisés sur la dimension (quelques centaines de lignes), puis
+        les codes se lisent par indexation sur les clés entières de la table de faits.
+        """
+        found = self.dimension_of(column)
+        if found is None:
+            raise KeyError(f"Colonne inconnue dans les dimensions : {column}")
+        dimension, key = found
+        dimension_codes, labels = group_codes(dimension[column])
+        keys = self.facts[key].to_numpy()
+        if rows is not None:
+            keys = keys[rows]
+        return np.asarray(dimension_codes)[keys], labels
+
+    def _label(self, dimension, key, column):
+        """Joint un attribut de dimension sur la table de faits (simple indexation par clé)"""
+        keys = self.facts[key].to_numpy()
+        values = dimension[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()[keys]
+            return pd.Categorical.from_codes(codes, dtype=values.dtype)
+        return values.to_numpy()[keys]
+
+    def to_frame(self, columns=None):
+        """Reconstitue la vue large, limitée aux colonnes demandées
+
+        Les libellés ne sont joints que pour les colonnes demandées ; les colonnes
+        catégorielles réutilisent les clés entières comme codes, sans comparaison de chaînes.
+        Reussite est relue dans les faits ; Reussite_Bool et Categorie_Note (et Reussite si
+        les faits ne la portent pas) sont recalculées à partir de Note_Finale.
+        """
+        from src.data_loader import add_derived_columns  # import local : data_loader importe ce module
+
+        if columns is None:
+            columns = [col for col in STUDENT_COLUMNS + COURSE_COLUMNS + TEACHER_COLUMNS + EVALUATION_COLUMNS
+                       if col in self.facts.columns or self.dimension_of(col) is not None]
+            columns += [col for col in self.facts.columns if col not in KEY_COLUMNS and col not in columns]
+            if 'Note_Finale' in self.facts.columns:
+                columns += [col for col in DERIVED_FACT_COLUMNS if col not in columns]
+
+        data = {}
+        for col in columns:
+            if col in self.facts.columns:
+                data[col] = self.facts[col]
+            elif col == 'Reussite' and 'Note_Finale' in self.facts.columns:
+                data[col] = self.facts['Note_Finale'] >= 10
+            elif col in DERIVED_FACT_COLUMNS and 'Note_Finale' in self.facts.columns:
+                data[col] = add_derived_columns(self.facts[['Note_Finale']].copy(), [col])[col]
+            elif self.dimension_of(col) is not None:
+                data[col] = self._label(*self.dimension_of(col), col)
+            else:
+                raise KeyError(f"Colonne inconnue dans le schéma en étoile : {col}")
+
+        return pd.DataFrame(data, index=self.facts.index)
+
+    def memory_usage(self):
+        """Mémoire occupée (octets) par la table de faits et les dimensions"""
+        return {
+            'faits': int(self.facts.memory_usage(deep=True).sum()),
+            'etudiants': int(self.students.memory_usage(deep=True).sum()),
+            'matieres': int(self.courses.memory_usage(deep=True).sum()),
+            'enseignants': int(self.teachers.memory_usage(deep=True).sum()),
+            'evaluations': int(self.evaluations.memory_usage(deep=True).sum())
+        }
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+from src.group_statistics import group_codes
+
+# Statut d'une UE après délibération
+ACQUISE = 'Acquise'
+COMPENSEE = 'Compensée'
+NON_ACQUISE = 'Non acquise'
+
+# Colonnes de pondération lues dans les données si elles existent (sinon poids 1)
+MATIERE_COEFFICIENT_COLUMN = 'Coefficient_Matiere'
+UE_CREDITS_COLUMN = 'Credits_UE'
+
+# Période de délibération : le semestre s'il est fourni, sinon l'année d'étude
+PERIOD_COLUMNS = ['Semestre', 'Annee_etude']
+
+# Sessions d'une même matière : la note de rattrapage remplace celle de la session
+# principale ('remplace') ou seule la meilleure des deux est retenue ('max')
+SESSION_COLUMN = 'Session'
+RETAKE_SESSION = 'Rattrapage'
+RETAKE_RULES = ['remplace', 'max']
+
+
+def _weights(df, column, mapping, key_column):
+    """Poids de chaque ligne : colonne des données, sinon table {code: poids}, sinon 1"""
+    if column in df.columns:
+        return df[column].to_numpy(dtype='float64')
+    if mapping:
+        return df[key_column].map(mapping).astype('float64').fillna(1.0).to_numpy()
+    return np.ones(len(df))
+
+
+def _segment_starts(*keys):
+    """Débuts des segments de clés triées (une nouvelle valeur de l'une des clés)"""
+    change = np.zeros(len(keys[0]), dtype=bool)
+    if len(change):
+        change[0] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def _segment_ids(starts, n):
+    """Numéro de segment de chaque élément"""
+    return np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+
+def _weighted_mean(values, weights, starts):
+    """Moyenne pondérée de chaque segment (np.add.reduceat sur les tableaux triés)"""
+    total = np.add.reduceat(weights, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.add.reduceat(values * weights, starts) / total, total
+
+
+class TranscriptAggregator:
+    """Moyennes pondérées matière → UE → période → étudiant et validation des UE
+
+    Les lignes sont triées une seule fois par (étudiant, période, UE, matière) ; chaque
+    niveau est une somme par segment (np.add.reduceat) des tableaux du niveau inférieur,
+    pour tous les étudiants à la fois :
+    - session : notes de devoir et d'examen pondérées par Coefficient_Devoir / Coefficient_Examen
+      (Note_Finale si ces colonnes manquent) ;
+    - matière : note de la session de rattrapage si elle existe (ou meilleure des deux
+      sessions avec retake_rule='max'), jamais une moyenne des deux sessions ;
+    - UE : matières pondérées par leur coefficient ; période : UE pondérées par leurs crédits ;
+      étudiant : périodes pondérées par leurs crédits.
+    Une UE est acquise si sa moyenne atteint pass_mark, compensée si la moyenne de la
+    période l'atteint et que la moyenne de l'UE n'est pas sous compensation_floor ; une
+    matière sous eliminatory_mark bloque l'UE. Une période est validée quand toutes
+    ses UE sont acquises ou compensées.
+    """
+
+    def __init__(self, matiere_coefficients=None, ue_credits=None, pass_mark=10.0,
+                 compensation_floor=None, eliminatory_mark=None, period_column=None, retake_rule='remplace'):
+        if retake_rule not in RETAKE_RULES:
+            raise ValueError(f"Règle de rattrapage inconnue : {retake_rule} (choix : {', '.join(RETAKE_RULES)})")
+        self.matiere_coefficients = matiere_coefficients  # {Code_Matiere: coefficient}
+        self.ue_credits = ue_credits                        # {Code_UE: crédits}
+        self.pass_mark = pass_mark
+        self.compensation_floor = compensation_floor
+        self.eliminatory_mark = eliminatory_mark
+        self.period_column = period_column
+        self.retake_rule = retake_rule
+
+    def _period_column(self, df):
+        if self.period_column is not None:
+            return self.period_column
+        return next((col for col in PERIOD_COLUMNS if col in df.columns), None)
+
+    def _row_grades(self, df):
+        """Note de chaque ligne et son poids dans la matière"""
+        columns = ['Note_Devoir', 'Note_Examen', 'Coefficient_Devoir', 'Coefficient_Examen']
+        if all(col in df.columns for col in columns):
+            devoir, examen, coef_devoir, coef_examen = (df[col].to_numpy(dtype='float64') for col in columns)
+            weights = coef_devoir + coef_examen
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return (devoir * coef_devoir + examen * coef_examen) / weights, weights
+        return df['Note_Finale'].to_numpy(dtype='float64'), np.ones(len(df))
+
+    @staticmethod
+    def _empty_result(index, n_keys):
+        """Résultat de compute sans aucune ligne (index vides à n_keys, n_keys - 1, n_keys - 2 et 1 niveaux)"""
+        def empty(levels, **columns):
+            return pd.DataFrame(columns, index=index([np.zeros(0, dtype=np.int64)] * levels))
+
+        no_values = np.zeros(0)
+        return {
+            'matieres': empty(n_keys, Moyenne=no_values, Coefficient=no_values),
+            'ues': empty(n_keys - 1, Moyenne=no_values, Credits=no_values,
+                         Statut=np.zeros(0, dtype=str), Credits_acquis=no_values),
+            'periodes': empty(n_keys - 2, Moyenne=no_values, Credits=no_values,
+                              Credits_acquis=no_values, Validee=np.zeros(0, dtype=bool)),
+            'etudiants': empty(1, Moyenne_Ponderee=no_values, Credits=no_values,
+                               Credits_acquis=no_values, Valide=np.zeros(0, dtype=bool)),
+        }
+
+    def compute(self, df):
+        """Dictionnaire de DataFrames 'matieres', 'ues', 'periodes' et 'etudiants'"""
+        period_column = self._period_column(df)
+        key_columns = ['ID_Etudiant'] + ([period_column] if period_column else []) + ['Code_UE', 'Code_Matiere']
+        codes, labels = zip(*(group_codes(df[col]) for col in key_columns))
+        codes = [np.asarray(code, dtype=np.int64) for code in codes]
+
+        def index(level_keys):
+            arrays = [np.asarray(labels[i])[key] for i, key in enumerate(level_keys)]
+            return pd.MultiIndex.from_arrays(arrays, names=key_columns[:len(level_keys)]) \
+                if len(arrays) > 1 else pd.Index(arrays[0], name=key_columns[0])
+
+        # Session de chaque ligne : 1 pour le rattrapage, 0 sinon (clé de tri la plus fine)
+        if SESSION_COLUMN in df.columns:
+            session = (df[SESSION_COLUMN].astype(str) == RETAKE_SESSION).to_numpy(dtype=np.int64)
+        else:
+            session = np.zeros(len(df), dtype=np.int64)
+
+        grades, row_weights = self._row_grades(df)
+        keep = np.all([code >= 0 for code in codes], axis=0) & ~np.isnan(grades)
+        # Tri unique : étudiant, période, UE, matière, session (la dernière clé de lexsort est la principale)
+        order = np.lexsort([session[keep]] + [code[keep] for code in reversed(codes)])
+        rows = np.flatnonzero(keep)[order]
+        if not len(rows):
+            # Aucune note exploitable (DataFrame vide) : tableaux vides avec les mêmes colonnes
+            return self._empty_result(index, len(key_columns))
+        keys = [code[rows] for code in codes]
+        grades, row_weights, session = grades[rows], row_weights[rows], session[rows]
+        coefficients = _weights(df, MATIERE_COEFFICIENT_COLUMN, self.matiere_coefficients, 'Code_Matiere')[rows]
+        credits = _weights(df, UE_CREDITS_COLUMN, self.ue_credits, 'Code_UE')[rows]
+
+        # Session, puis matière : une seule session retenue par matière
+        session_starts = _segment_starts(*keys, session)
+        session_avg, _ = _weighted_mean(grades, row_weights, session_starts)
+        session_keys = [key[session_starts] for key in keys]
+        matiere_starts = _segment_starts(*session_keys)
+        if self.retake_rule == 'max':
+            matiere_avg = np.maximum.reduceat(session_avg, matiere_starts)
+        else:
+            # Sessions triées : la dernière de chaque matière est le rattrapage s'il a eu lieu
+            matiere_avg = session_avg[np.append(matiere_starts[1:], len(session_starts)) - 1]
+        matiere_keys = [key[matiere_starts] for key in session_keys]
+        matiere_coef = coefficients[session_starts][matiere_starts]
+        matiere_credits = credits[session_starts][matiere_starts]
+
+        # UE (les clés de niveau supérieur sont les premières)
+        ue_starts = _segment_starts(*matiere_keys[:-1])
+        ue_avg, _ = _weighted_mean(matiere_avg, matiere_coef, ue_starts)
+        ue_keys = [key[ue_starts] for key in matiere_keys[:-1]]
+        ue_credits = matiere_credits[ue_starts]
+        blocked = np.zeros(len(ue_starts), dtype=bool)
+        if self.eliminatory_mark is not None:
+            blocked = np.maximum.reduceat((matiere_avg < self.eliminatory_mark).astype(np.int8), ue_starts) > 0
+
+        # Période
+        period_starts = _segment_starts(*ue_keys[:-1])
+        period_avg, period_credits = _weighted_mean(ue_avg, ue_credits, period_starts)
+        period_of_ue = _segment_ids(period_starts, len(ue_starts))
+
+        acquired = (ue_avg >= self.pass_mark) & ~blocked
+        compensable = (period_avg[period_of_ue] >= self.pass_mark) & ~blocked
+        if self.compensation_floor is not None:
+            compensable &= ue_avg >= self.compensation_floor
+        compensated = ~acquired & compensable
+        status = np.where(acquired, ACQUISE, np.where(compensated, COMPENSEE, NON_ACQUISE))
+        earned = np.where(acquired | compensated, ue_credits, 0.0)
+        period_earned = np.add.reduceat(earned, period_starts)
+        period_valid = np.logical_and.reduceat(acquired | compensated, period_starts)
+
+        # Étudiant
+        period_keys = [key[period_starts] for key in ue_keys[:-1]]
+        student_starts = _segment_starts(period_keys[0])
+        student_avg, student_credits = _weighted_mean(period_avg, period_credits, student_starts)
+
+        return {
+            'matieres': pd.DataFrame({
+                'Moyenne': matiere_avg,
+                'Coefficient': matiere_coef
+            }, index=index(matiere_keys)),
+            'ues': pd.DataFrame({
+                'Moyenne': ue_avg,
+                'Credits': ue_credits,
+                'Statut': status,
+                'Credits_acquis': earned
+            }, index=index(ue_keys)),
+            'periodes': pd.DataFrame({
+                'Moyenne': period_avg,
+                'Credits': period_credits,
+                'Credits_acquis': period_earned,
+                'Validee': period_valid
+            }, index=index(period_keys)),
+            'etudiants': pd.DataFrame({
+                'Moyenne_Ponderee': student_avg,
+                'Credits': student_credits,
+                'Credits_acquis': np.add.reduceat(period_earned, student_starts),
+                'Valide': np.logical_and.reduceat(period_valid, student_starts)
+            }, index=index([period_keys[0][student_starts]]))
+        }
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from src.group_statistics import group_codes
+from src.ranking import rank_within
+
+# Regroupements pour lesquels les taux de réussite de chaque scénario sont calculés
+WHAT_IF_GROUPS = ['Departement', 'Filière', 'Annee_etude', 'Nom_UE', 'Matiere']
+
+# Situation actuelle : notes finales des données et réussite à 10 (Reussite_Bool)
+BASELINE_THRESHOLD = 10.0
+
+# Taille maximale (scénarios x notes) d'une matrice de notes finales évaluée en une fois
+MAX_BATCH_SIZE = 4_000_000
+
+
+def scenario_grid(coefficients_devoir, thresholds):
+    """Scénarios de toutes les combinaisons (coefficient du devoir, seuil), l'examen complétant à 1"""
+    return [{'Coefficient_Devoir': coefficient, 'Seuil': threshold}
+            for coefficient in coefficients_devoir for threshold in thresholds]
+
+
+class WhatIfEngine:
+    """Simulation de jury : notes finales, réussites, taux par groupe et rangs sous d'autres règles
+
+    Les notes de devoir et d'examen sont gardées en tableaux ; les scénarios
+    (coefficients, seuil) sont évalués par lots, sur des matrices scénarios × notes
+    d'au plus MAX_BATCH_SIZE éléments : note finale arrondie au dixième comme à la
+    génération des données, réussite, taux par groupe et moyennes par étudiant par
+    np.bincount sur des codes (scénario, groupe). Seuls ces agrégats (scénarios ×
+    groupes, scénarios × étudiants) sont conservés d'un lot à l'autre ; les rangs de
+    tous les scénarios sont ensuite calculés en un seul tri.
+    """
+
+    def __init__(self, df, group_columns=None):
+        self.devoir = df['Note_Devoir'].to_numpy(dtype='float64')
+        self.examen = df['Note_Examen'].to_numpy(dtype='float64')
+        # Notes finales stockées en float32 : ramenées sur la grille au dixième des scénarios
+        # (mêmes flottants que finals()), sinon le scénario identité changerait des rangs
+        self.finale = np.round(df['Note_Finale'].to_numpy(dtype='float64'), 1)
+        self.groups = {}
+        for col in (group_columns or WHAT_IF_GROUPS):
+            if col in df.columns:
+                self.groups[col] = group_codes(df[col])
+        self.students = group_codes(df['ID_Etudiant']) if 'ID_Etudiant' in df.columns else None
+
+    def finals(self, coefficients_devoir, coefficients_examen):
+        """Notes finales (scénarios x notes) pour des coefficients donnés"""
+        cd = np.asarray(coefficients_devoir, dtype='float64')[:, None]
+        ce = np.asarray(coefficients_examen, dtype='float64')[:, None]
+        return np.clip(np.round(self.devoir * cd + self.examen * ce, 1), 0, 20)
+
+    def _group_rates(self, codes, n_groups, passed):
+        """Taux de réussite (%) de chaque groupe pour chaque scénario (scénarios x groupes)"""
+        valid = codes >= 0
+        n_scenarios = passed.shape[0]
+        flat = (np.arange(n_scenarios)[:, None] * n_groups + codes[valid]).ravel()
+        successes = np.bincount(flat, weights=passed[:, valid].ravel(), minlength=n_scenarios * n_groups)
+        counts = np.bincount(codes[valid], minlength=n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return successes.reshape(n_scenarios, n_groups) / counts * 100
+
+    def _student_averages(self, finals):
+        """Moyenne de chaque étudiant pour chaque ligne de finals (lignes x étudiants)"""
+        codes, labels = self.students
+        valid = codes >= 0
+        n_rows, n_students = finals.shape[0], len(labels)
+        flat = (np.arange(n_rows)[:, None] * n_students + codes[valid]).ravel()
+        sums = np.bincount(flat, weights=finals[:, valid].ravel(), minlength=n_rows * n_students)
+        counts = np.bincount(codes[valid], minlength=n_students)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averages = sums.reshape(n_rows, n_students) / counts
+        # Arrondi : des moyennes égales ne doivent pas être départagées par l'ordre des sommes
+        return np.round(averages, 9)
+
+    def _batches(self, n_scenarios):
+        """Tranches de scénarios dont la matrice de notes finales tient dans MAX_BATCH_SIZE"""
+        size = max(1, MAX_BATCH_SIZE // max(len(self.finale), 1))
+        return [slice(start, min(start + size, n_scenarios)) for start in range(0, n_scenarios, size)]
+
+    def run(self, scenarios):
+        """Évalue une liste de scénarios {'Coefficient_Devoir', 'Coefficient_Examen', 'Seuil'}
+
+        Coefficient_Examen vaut 1 - Coefficient_Devoir s'il est omis, Seuil vaut 10.
+        Retourne un dictionnaire :
+        - 'scenarios' : paramètres, moyenne, réussites, taux, écart au taux actuel, notes changeant de statut ;
+        - 'groupes' : {colonne: taux de réussite par groupe (colonne 'Actuel' + un scénario par colonne)} ;
+        - 'rangs' : rang de chaque étudiant (colonne 'Actuel' + un par scénario) ;
+        - 'variations_rangs' : places gagnées (positif) ou perdues par rapport au rang actuel.
+        """
+        coef_devoir = np.array([s['Coefficient_Devoir'] for s in scenarios], dtype='float64')
+        coef_examen = np.array([s.get('Coefficient_Examen', 1 - s['Coefficient_Devoir']) for s in scenarios],
+                               dtype='float64')
+        thresholds = np.array([s.get('Seuil', BASELINE_THRESHOLD) for s in scenarios], dtype='float64')
+
+        baseline = self.finale >= BASELINE_THRESHOLD
+        n = len(self.finale)
+        n_scenarios = len(scenarios)
+        group_codes_ = {col: (np.asarray(codes, dtype=np.int64), labels) for col, (codes, labels) in self.groups.items()}
+
+        # Agrégats par scénario (ligne 0 : situation actuelle), remplis lot par lot
+        totals = np.zeros(n_scenarios)
+        successes = np.zeros(n_scenarios, dtype=np.int64)
+        changes = np.zeros(n_scenarios, dtype=np.int64)
+        group_rates = {col: np.empty((n_scenarios + 1, len(labels))) for col, (_, labels) in group_codes_.items()}
+        for col, (codes, labels) in group_codes_.items():
+            group_rates[col][0] = self._group_rates(codes, len(labels), baseline[None, :])[0]
+        averages = None
+        if self.students is not None:
+            averages = np.empty((n_scenarios + 1, len(self.students[1])))
+            averages[0] = self._student_averages(self.finale[None, :])[0]
+
+        for batch in self._batches(n_scenarios):
+            finals = self.finals(coef_devoir[batch], coef_examen[batch])
+            passed = finals >= thresholds[batch, None]
+            totals[batch] = finals.sum(axis=1)
+            successes[batch] = passed.sum(axis=1)
+            changes[batch] = (passed != baseline).sum(axis=1)
+            rows = slice(batch.start + 1, batch.stop + 1)
+            for col, (codes, labels) in group_codes_.items():
+                group_rates[col][rows] = self._group_rates(codes, len(labels), passed)
+            if averages is not None:
+                averages[rows] = self._student_averages(finals)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = successes / n * 100
+            baseline_rate = baseline.sum() / n * 100
+            means = totals / n
+        summary = pd.DataFrame({
+            'Coefficient_Devoir': coef_devoir,
+            'Coefficient_Examen': coef_examen,
+            'Seuil': thresholds,
+            'Moyenne': means,
+            'Nombre_reussites': successes,
+            'Taux_reussite': rates,
+            'Variation_taux': rates - baseline_rate,
+            'Changements_statut': changes
+        }, index=pd.RangeIndex(n_scenarios, name='Scenario'))
+
+        groups = {}
+        for col, (codes, labels) in group_codes_.items():
+            frame = pd.DataFrame(group_rates[col].T, index=pd.Index(labels, name=col),
+                                 columns=['Actuel'] + list(summary.index))
+            groups[col] = frame[np.bincount(codes[codes >= 0], minlength=len(labels)) > 0]
+
+        result = {'scenarios': summary, 'groupes': groups}
+        if averages is not None:
+            n_rows, n_students = averages.shape
+            ranks, _, _ = rank_within(averages.ravel(), np.repeat(np.arange(n_rows), n_students))
+            codes = self.students[0]
+            observed = np.bincount(codes[codes >= 0], minlength=n_students) > 0
+            index = pd.Index(self.students[1], name='ID_Etudiant')
+            ranks = pd.DataFrame(ranks.reshape(n_rows, n_students).T, index=index,
+                                 columns=['Actuel'] + list(summary.index))[observed]
+            result['rangs'] = ranks
+            result['variations_rangs'] = ranks[list(summary.index)].rsub(ranks['Actuel'], axis=0)
+        return result
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.data_loader import DataLoader, add_derived_columns  # noqa: E402
+
+RAW_DATA = ROOT / 'data' / 'raw' / 'notes_epl.csv'
+
+
+@pytest.fixture(scope='session')
+def notes():
+    """Données nettoyées du fichier d'exemple (sans écrire de cache)"""
+    return DataLoader(RAW_DATA).load_clean_data(use_cache=False)
+
+
+def make_notes(rows):
+    """Petit DataFrame nettoyé à partir de dictionnaires (colonnes manquantes complétées)"""
+    df = pd.DataFrame(rows)
+    defaults = {
+        'Nom': 'Nom', 'Prenom': 'Prenom', 'Departement': 'Génie Civil', 'Grade': 'Licence',
+        'Annee_etude': 1, 'Filière': 'Géotechnique', 'Code_UE': 'UE1', 'Nom_UE': 'UE 1',
+        'Code_Matiere': 'M1', 'Matiere': 'Matière 1', 'Enseignant': 'Enseignant 1',
+        'Session': 'Principale', 'Coefficient_Devoir': 0.4, 'Coefficient_Examen': 0.6,
+        'Date_Devoir': pd.Timestamp('2024-11-15'), 'Date_Examen': pd.Timestamp('2025-01-20'),
+    }
+    for col, value in defaults.items():
+        if col not in df.columns:
+            df[col] = value
+    if 'Note_Devoir' not in df.columns:
+        df['Note_Devoir'] = df['Note_Finale']
+    if 'Note_Examen' not in df.columns:
+        df['Note_Examen'] = df['Note_Finale']
+    for col in ['Note_Devoir', 'Note_Examen', 'Note_Finale', 'Coefficient_Devoir', 'Coefficient_Examen']:
+        df[col] = df[col].astype('float32')
+    df['Annee_etude'] = df['Annee_etude'].astype(np.int8)
+    if 'Reussite' not in df.columns:
+        df['Reussite'] = df['Note_Finale'] >= 10
+    for col in ['ID_Etudiant', 'Nom', 'Prenom', 'Departement', 'Grade', 'Filière', 'Code_UE', 'Nom_UE',
+                'Code_Matiere', 'Matiere', 'Enseignant', 'Session']:
+        df[col] = df[col].astype('category')
+    return add_derived_columns(df)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_notes
+from src.accumulators import BasicStatisticsAccumulator
+
+
+def _assert_same_statistics(result, expected):
+    for key, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(result[key], value)
+        else:
+            assert result[key] == value
+
+
+def test_save_and_load_exact_state(notes, tmp_path):
+    accumulator = BasicStatisticsAccumulator().update(notes)
+    accumulator.save(tmp_path / 'statistiques.npz')
+    loaded = BasicStatisticsAccumulator.load(tmp_path / 'statistiques.npz')
+    _assert_same_statistics(loaded.statistics(), accumulator.statistics())
+
+
+def test_save_and_load_digests_without_pickle(tmp_path):
+    # Notes hors de la grille au dixième : les accumulateurs passent aux t-digests
+    values = np.linspace(0, 20, 500)
+    df = make_notes({'ID_Etudiant': [f"E{i}" for i in range(500)], 'Note_Finale': values,
+                     'Departement': np.where(np.arange(500) % 2, 'Génie Civil', 'Génie Informatique')})
+    accumulator = BasicStatisticsAccumulator().update(df)
+    assert accumulator.accumulators['par_departement'].digests is not None
+    accumulator.save(tmp_path / 'statistiques.npz')
+
+    with np.load(tmp_path / 'statistiques.npz', allow_pickle=False) as state:
+        assert all(state[name].dtype != object for name in state.files)
+    loaded = BasicStatisticsAccumulator.load(tmp_path / 'statistiques.npz')
+    _assert_same_statistics(loaded.statistics(), accumulator.statistics())
+
+    # L'état rechargé continue d'accumuler comme l'original
+    loaded.update(df)
+    accumulator.update(df)
+    _assert_same_statistics(loaded.statistics(), accumulator.statistics())
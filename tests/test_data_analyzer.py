@@ -0,0 +1,20 @@
+from src.data_analyzer import DataAnalyzer
+from src.olap_cube import GradeCube
+
+
+def test_overall_success_rate_returns_python_numbers(notes):
+    for analyzer in (DataAnalyzer(notes), DataAnalyzer(notes, cube=GradeCube.from_frame(notes))):
+        totals = analyzer.calculate_success_rate()
+        assert type(totals['Nombre_notes']) is int
+        assert totals['Nombre_notes'] == len(notes)
+        assert type(totals['Taux_reussite']) is float
+        assert type(totals['Moyenne_finale']) is float
+
+
+def test_comparison_is_cached_once(notes):
+    analyzer = DataAnalyzer(notes)
+    analyzer.compare_groups('Departement')
+    analyzer.calculate_success_rate('Filière')
+    assert len(analyzer.cache) == 2
+    analyzer.compare_groups('Departement')
+    assert analyzer.cache.hits == 1
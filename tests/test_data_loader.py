@@ -0,0 +1,35 @@
+import pandas as pd
+
+from conftest import RAW_DATA
+from src.data_loader import DataLoader
+from src.data_store import DataStore, concat_frames
+
+
+def _with_duplicated_tail(tmp_path, n_duplicates=500):
+    """CSV d'exemple suivi de ses n_duplicates premières lignes (dernier bloc entièrement en double)"""
+    raw = pd.read_csv(RAW_DATA, encoding='utf-8')
+    path = tmp_path / 'notes.csv'
+    pd.concat([raw, raw.iloc[:n_duplicates]]).to_csv(path, index=False, encoding='utf-8')
+    return path, len(raw)
+
+
+def test_chunked_store_skips_fully_duplicated_chunk(tmp_path):
+    path, n_rows = _with_duplicated_tail(tmp_path)
+    loader = DataLoader(path)
+    store = loader.load_data_chunked(chunksize=3000, output_dir=tmp_path / 'store')
+    assert len(store.parts()) == n_rows // 3000
+    assert len(store.read()) == n_rows
+
+
+def test_chunked_frame_skips_fully_duplicated_chunk(tmp_path):
+    path, n_rows = _with_duplicated_tail(tmp_path)
+    df = DataLoader(path).load_data_chunked(chunksize=3000)
+    assert len(df) == n_rows
+    assert isinstance(df['Departement'].dtype, pd.CategoricalDtype)
+
+
+def test_concat_frames_ignores_empty_frames(notes):
+    empty = notes.iloc[:0].astype({'Departement': 'object'}).astype({'Departement': 'category'})
+    result = concat_frames([notes.iloc[:10], empty, notes.iloc[10:20]])
+    assert len(result) == 20
+    assert result['Departement'].dtype == notes['Departement'].dtype
@@ -0,0 +1,21 @@
+from src.filter_index import FilterIndex
+
+
+def test_views_are_kept_per_filter_signature(notes):
+    index = FilterIndex(notes)
+    civil = {'Departement': ['Génie Civil']}
+    first_year = {'Annee_etude': [1]}
+    view = index.view(civil)
+    assert len(view) == notes['Departement'].eq('Génie Civil').sum()
+    index.view(first_year)
+    # Retour à un jeu de filtres déjà vu : la vue n'est pas extraite une seconde fois
+    assert index.view(civil) is view
+    assert index.view({}) is notes
+
+
+def test_view_cache_is_bounded_by_rows(notes):
+    index = FilterIndex(notes)
+    views = [index.view({'Annee_etude': [year]}) for year in sorted(notes['Annee_etude'].unique())]
+    views.append(index.view({'Annee_etude': [1, 2, 3]}))
+    assert index._view_rows <= len(notes)
+    assert sum(len(view) for view in views) > len(notes)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from conftest import make_notes
+from src.olap_cube import GradeCube
+
+
+def test_variance_matches_rows(notes):
+    cube = GradeCube.from_frame(notes)
+    grades = notes.assign(_note=notes['Note_Finale'].astype('float64'))
+    for col in ['Departement', 'Filière', 'Matiere']:
+        expected = grades.groupby(col, observed=True)['_note'].var()
+        result = cube.query(None, col)['Variance']
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_merged_cube_keeps_variance(notes):
+    merged = GradeCube.from_frame(notes.iloc[:7000]).merge(GradeCube.from_frame(notes.iloc[7000:]))
+    np.testing.assert_allclose(merged.query(None, 'Matiere')['Variance'].to_numpy(),
+                               GradeCube.from_frame(notes).query(None, 'Matiere')['Variance'].to_numpy(),
+                               rtol=1e-12)
+
+
+def test_variance_of_clustered_grades():
+    # Grandes valeurs très regroupées : Σx² − n·moyenne² perdrait tous les chiffres significatifs
+    values = np.float32(10000) + (np.arange(999) % 3) * np.float32(0.01)
+    df = make_notes({'ID_Etudiant': [f"E{i}" for i in range(999)], 'Note_Finale': values})
+    result = GradeCube.from_frame(df).query(None, 'Departement')['Variance'].iloc[0]
+    assert np.isclose(result, df['Note_Finale'].astype('float64').var(), rtol=1e-9)
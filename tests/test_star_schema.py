@@ -0,0 +1,37 @@
+import pandas as pd
+
+from conftest import make_notes
+from src.data_analyzer import DataAnalyzer
+from src.star_schema import StarSchema
+
+
+def _student_over_two_years():
+    # E1 est inscrit en 1re puis en 2e année : Annee_etude ne dépend pas de ID_Etudiant
+    return make_notes({
+        'ID_Etudiant': ['E1', 'E1', 'E1', 'E2'],
+        'Annee_etude': [1, 1, 2, 1],
+        'Note_Finale': [8.0, 12.0, 15.0, 11.0],
+    })
+
+
+def test_attribute_varying_per_student_stays_in_facts():
+    df = _student_over_two_years()
+    schema = StarSchema.from_frame(df)
+    assert 'Annee_etude' not in schema.students.columns
+    assert 'Annee_etude' in schema.facts.columns
+    assert schema.dimension_of('Annee_etude') is None
+    assert schema.to_frame(['Annee_etude'])['Annee_etude'].tolist() == [1, 1, 2, 1]
+
+
+def test_group_by_enrolment_year_matches_rows():
+    df = _student_over_two_years()
+    expected = DataAnalyzer(df).compare_groups('Annee_etude')
+    result = DataAnalyzer(df, schema=StarSchema.from_frame(df)).compare_groups('Annee_etude')
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.loc[2, 'Count'] == 1
+
+
+def test_reussite_round_trips():
+    # Reussite telle que chargée, même si elle diffère de Note_Finale >= 10
+    df = make_notes({'ID_Etudiant': ['E1', 'E2'], 'Note_Finale': [12.0, 8.0], 'Reussite': [False, True]})
+    assert StarSchema.from_frame(df).to_frame(['Reussite'])['Reussite'].tolist() == [False, True]
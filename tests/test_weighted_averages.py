@@ -0,0 +1,11 @@
+from src.weighted_averages import TranscriptAggregator
+
+
+def test_empty_frame_gives_empty_results(notes):
+    full = TranscriptAggregator().compute(notes)
+    empty = TranscriptAggregator().compute(notes.iloc[:0])
+    assert set(empty) == set(full)
+    for level, frame in full.items():
+        assert len(empty[level]) == 0
+        assert list(empty[level].columns) == list(frame.columns)
+        assert list(empty[level].index.names) == list(frame.index.names)
@@ -0,0 +1,10 @@
+from src.what_if import WhatIfEngine
+
+
+def test_identity_scenario_changes_nothing(notes):
+    # Coefficients et seuil des données : aucune note, réussite ni rang ne doit changer
+    result = WhatIfEngine(notes).run([{'Coefficient_Devoir': 0.4, 'Seuil': 10}])
+    assert result['scenarios'].loc[0, 'Changements_statut'] == 0
+    assert result['scenarios'].loc[0, 'Variation_taux'] == 0
+    assert (result['variations_rangs'][0] == 0).all()
+    assert (result['rangs'][0] == result['rangs']['Actuel']).all()